@@ -1,3 +1,6 @@
+import weakref
+
+
 def complete_data(data: dict) -> dict:
     """Default implementation for completing data with frontend properties.
     When running with a frontend that needs to store additional information about
@@ -7,18 +10,61 @@ def complete_data(data: dict) -> dict:
 
 
 class Event:
+    """
+    A simple signal whose slots (callbacks) are called in the order they were connected.
+    The slots are stored in a tuple which is replaced on every (dis)connect, so emitting an event nobody is
+    listening to costs almost nothing, and slots can be (dis)connected while the event is being emitted.
+    A slot connected with weak=True doesn't keep its object (or function) alive, it's removed automatically
+    once that is garbage collected, so e.g. frontend components that are gone don't leak.
+    """
+
+    __slots__ = ('args', '_slots', '__weakref__')
+
     def __init__(self, *args):
-        self.args = args
-        self._slots = []
+        self.args = args    # only for documentation purposes
+        self._slots = ()
 
-    def connect(self, callback):
-        self._slots.append(callback)
+    def connect(self, callback, weak: bool = False):
+        self._slots = self._slots + (_WeakSlot(self, callback) if weak else callback,)
 
     def disconnect(self, callback):
-        self._slots.remove(callback)
+        for i, slot in enumerate(self._slots):
+            if slot == callback or (isinstance(slot, _WeakSlot) and slot.ref() == callback):
+                self._slots = self._slots[:i] + self._slots[i+1:]
+                return
+
+        raise ValueError('callback is not connected')
 
     def emit(self, *args):
-        for cb in self._slots:
+        if self._slots:     # fast path, no iterator is created if nobody is listening
+            for cb in self._slots:
+                cb(*args)
+
+    def _discard(self, slot):
+        self._slots = tuple(s for s in self._slots if s is not slot)
+
+
+class _WeakSlot:
+    """A weakly referenced slot of an Event, removes itself from the event when the callback dies"""
+
+    __slots__ = ('ref',)
+
+    def __init__(self, event: Event, callback):
+        event_ref = weakref.ref(event)
+
+        def remove(_):
+            e = event_ref()
+            if e is not None:
+                e._discard(self)
+
+        if hasattr(callback, '__self__') and hasattr(callback, '__func__'):     # bound method
+            self.ref = weakref.WeakMethod(callback, remove)
+        else:
+            self.ref = weakref.ref(callback, remove)
+
+    def __call__(self, *args):
+        cb = self.ref()
+        if cb is not None:
             cb(*args)
 
 
@@ -26,8 +72,12 @@ class Base:
     """
     Base class for all abstract components. Provides functionality for ID counting.
     Assigns a global ID to every object and provides an optional custom ID counter for additional custom counting.
+    Components which exist in large numbers (ports, connections) define __slots__, so they don't have an
+    instance __dict__; subclasses which don't define __slots__ get one as usual.
     """
 
+    __slots__ = ('GLOBAL_ID', 'ID', '__weakref__')
+
     class IDCtr:
         def __init__(self):
             self.ctr = -1
@@ -63,11 +113,6 @@ class Base:
         if self.id_ctr is not None and not (hasattr(self, 'ID') and self.ID is not None):
             self.ID = self.id_ctr.count()
 
-        self._slots = {
-            ev: []
-            for ev in self.events
-        }
-
     # CUSTOM DATA ------------------------------------
 
     # this can be set to another function by the frontend to implement adding frontend information to the data dict
@@ -82,12 +127,10 @@ class Base:
 
     # EVENTS ------------------------------------
 
-    def on(self, ev: Event, callback):
-        # self._slots[ev].append(callback)
-        ev.connect(callback)
+    def on(self, ev: Event, callback, weak: bool = False):
+        ev.connect(callback, weak)
 
     def off(self, ev: Event, callback):
-        # self._slots[ev].remove(callback)
         ev.disconnect(callback)
 
     # def _emit(self, ev: str, *args, **kwargs):
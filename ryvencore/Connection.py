@@ -1,6 +1,7 @@
 from .Base import Base, Event
 
 from .InfoMsgs import InfoMsgs
+from .Tracer import Tracer
 
 
 class Connection(Base):
@@ -9,31 +10,60 @@ class Connection(Base):
     port to some connected input port.
     """
 
+    __slots__ = ('out', 'inp', 'flow', '_activated')
+
+    # feedback connections (see FeedbackConnection) are not considered by the graph analyses
+    feedback = False
+
     def __init__(self, params):
         Base.__init__(self)
 
-        self.activated = Event(object)
+        # the activated event is created when it's accessed first, most connections never need one
+        self._activated: Event = None
 
         self.out, self.inp, self.flow = params
 
+    @property
+    def activated(self) -> Event:
+        """Emitted with the data when the connection gets activated, e.g. for frontends to visualize it"""
+
+        if self._activated is None:
+            self._activated = Event(object)
+        return self._activated
+
     def activate(self, data=None):
         """Causes forward propagation of information"""
 
-        self.activated.emit(data)
+        if self._activated is not None:
+            self._activated.emit(data)
+
+    def trace_args(self) -> dict:
+        """The args of the connection's spans, see Tracer"""
+
+        return {'connection': self.GLOBAL_ID, 'from': self.out.node.title, 'to': self.inp.node.title}
 
 
 class ExecConnection(Connection):
 
+    __slots__ = ()
+
     def activate(self, data=None):
         """Causes an update in the input port"""
-        InfoMsgs.write('exec connection activated')
+        if InfoMsgs.enabled:
+            InfoMsgs.write('exec connection activated')
+        start = Tracer.now() if Tracer.enabled else None
         super().activate()
 
         self.inp.update()
 
+        if start is not None:
+            Tracer.span('activate', 'connection', start, self.trace_args())
+
 
 class DataConnection(Connection):
 
+    __slots__ = ('data',)
+
     def __init__(self, params):
         super().__init__(params)
 
@@ -41,7 +71,8 @@ class DataConnection(Connection):
 
     def get_val(self):
         """Gets the value of the output port -- only used in exec mode flows"""
-        InfoMsgs.write('data connection getting value')
+        if InfoMsgs.enabled:
+            InfoMsgs.write('data connection getting value')
 
         # request data backwards
         self.data = self.out.get_val()
@@ -50,7 +81,9 @@ class DataConnection(Connection):
 
     def activate(self, data=None):
         """Passes data to the input port and causes update"""
-        InfoMsgs.write('data connection activated')
+        if InfoMsgs.enabled:
+            InfoMsgs.write('data connection activated')
+        start = Tracer.now() if Tracer.enabled else None
         super().activate(data)
 
         # store data
@@ -58,3 +91,39 @@ class DataConnection(Connection):
 
         # propagate data forward
         self.inp.update(data)
+
+        if start is not None:
+            Tracer.span('activate', 'connection', start, self.trace_args())
+
+
+class FeedbackConnection(DataConnection):
+    """
+    A data connection closing a cycle, which delays its data by one tick (like z^-1 in a block diagram).
+    Its activation only passes the data to the input port without causing an update, the input's node
+    reads it the next time it gets updated. In a cycle, this is the next execution (tick), which therefore
+    reads the value computed in the previous one. Feedback connections are ignored by the graph analyses,
+    so cycles containing one can be executed in a bounded number of steps in all algorithm modes.
+    They are also the only connections which can connect a node's output to one of its own inputs.
+    """
+
+    __slots__ = ()
+
+    feedback = True
+
+    def get_val(self):
+        """Gets the current value of the output port without updating its node -- only used in exec mode flows"""
+        if InfoMsgs.enabled:
+            InfoMsgs.write('feedback connection getting value')
+
+        self.data = self.out.val
+
+        return self.data
+
+    def activate(self, data=None):
+        """Passes data to the input port without causing an update"""
+        if InfoMsgs.enabled:
+            InfoMsgs.write('feedback connection activated')
+        Connection.activate(self, data)
+
+        self.data = data
+        self.inp.val = data
@@ -1,10 +1,13 @@
 from .Base import Base, Event
-from .Connection import Connection, DataConnection, ExecConnection
-from .FlowExecutor import DataFlowOptimized, FlowExecutor
+from .Connection import Connection, DataConnection, ExecConnection, FeedbackConnection
+from .FlowExecutor import DataFlowOptimized, DataFlowCompiled, DataFlowParallel, DataFlowMultiprocess, \
+    DataFlowAsync, DataFlowBatch, DataFlowIterative, ExecFlowCached, FlowExecutor
 from .Node import Node
-from .NodePort import NodePort
+from .NodePort import NodePort, NodeOutput
+from .Profiler import Profiler
 from .RC import FlowAlg, PortObjPos
-from .utils import node_from_identifier
+from .utils import node_from_identifier, strongly_connected_components, OrderedSet
+from contextlib import contextmanager
 from typing import List, Dict, Optional
 
 
@@ -25,24 +28,45 @@ class Flow(Base):
         self.connection_request_valid = Event(bool)
         self.nodes_created_from_data = Event(list)
         self.connections_created_from_data = Event(list)
+        #   emitted with all nodes/connections added in a batch edit, or with every single one added outside of one
+        self.nodes_created = Event(list)
+        self.connections_created = Event(list)
 
         self.algorithm_mode_changed = Event(str)
 
         # general attributes
         self.session = session
         self.script = script
-        self.nodes: [Node] = []
-        self.connections: [Connection] = []
+        #   ordered sets, so edits are O(1) while nodes and connections can still be accessed like lists
+        self.nodes: OrderedSet = OrderedSet()
+        self.connections: OrderedSet = OrderedSet()
 
         self.alg_mode = FlowAlg.DATA
 
         # special executors
-        self.executor_data_opt = DataFlowOptimized(self)
+        self.executors: Dict[FlowAlg, FlowExecutor] = {
+            FlowAlg.EXEC: ExecFlowCached(self),
+            FlowAlg.DATA_OPT: DataFlowOptimized(self),
+            FlowAlg.DATA_COMPILED: DataFlowCompiled(self),
+            FlowAlg.DATA_PARALLEL: DataFlowParallel(self),
+            FlowAlg.DATA_MULTIPROCESS: DataFlowMultiprocess(self),
+            FlowAlg.DATA_ASYNC: DataFlowAsync(self),
+            FlowAlg.DATA_ITERATIVE: DataFlowIterative(self),
+        }
+        self.executor_data_opt = self.executors[FlowAlg.DATA_OPT]
         self.executor: FlowExecutor = None
         self.running_with_executor = False
         self._update_running_with_executor()
         #   additional data structures for executors
-        self.node_successors = {}
+        self.node_successors: Dict[Node, Dict[Node, int]] = {}  # node -> successor -> number of connections
+        self.execution_start = None     # Tracer timestamp of the current data mode execution, if it's traced
+
+        # batch edits, see batch_edit()
+        self._batch_depth = 0
+        self._batch_events = []         # deferred (event, argument) emits, in order
+        self._batch_updates = {}        # deferred (node, input index) updates, in order
+        self._batch_nodes = []          # nodes added in the batch edit
+        self._batch_connections = []    # connections added in the batch edit
 
 
     def load(self, data):
@@ -50,45 +74,50 @@ class Flow(Base):
 
         # algorithm mode
         mode = data['algorithm mode']
-        if mode == 'data' or mode == 'data flow':
-            self.set_algorithm_mode('data')
-        elif mode == 'data opt':
-            self.set_algorithm_mode('data opt')
-        elif mode == 'exec' or mode == 'exec flow':
-            self.set_algorithm_mode('exec')
+        if mode == 'data flow':     # backwards compatibility
+            mode = 'data'
+        elif mode == 'exec flow':
+            mode = 'exec'
+        self.set_algorithm_mode(mode)
 
         # build flow
 
-        new_nodes = self.create_nodes_from_data(data['nodes'])
+        with self.batch_edit():
+            new_nodes = self.create_nodes_from_data(data['nodes'])
 
-        #   the following connections should not cause updates in sequential nodes
-        blocked_nodes = filter(lambda n: n.block_init_updates, new_nodes)
-        for node in blocked_nodes:
-            node.block_updates = True
+            #   the following connections should not cause updates in sequential nodes
+            blocked_nodes = [n for n in new_nodes if n.block_init_updates]
+            for node in blocked_nodes:
+                node.block_updates = True
 
-        self.connect_nodes_from_data(new_nodes, data['connections'])
+            self.connect_nodes_from_data(new_nodes, data['connections'])
 
-        for node in blocked_nodes:
-            node.block_updates = False
+            for node in blocked_nodes:
+                node.block_updates = False
 
 
     def create_nodes_from_data(self, nodes_data: List):
         """Creates Nodes from nodes_data, previously returned by data()"""
 
         nodes = []
+        node_classes = {}   # identifier -> node class, so every identifier is only looked up once
 
         for n_c in nodes_data:
 
             # find class
-            node_class = node_from_identifier(
-                n_c['identifier'],
-                self.session.nodes + self.session.invisible_nodes
-            )
+            identifier = n_c['identifier']
+            node_class = node_classes.get(identifier)
+            if node_class is None:
+                node_class = node_from_identifier(
+                    identifier,
+                    self.session.nodes + self.session.invisible_nodes
+                )
+                node_classes[identifier] = node_class
 
             node = self.create_node(node_class, n_c)
             nodes.append(node)
 
-        self.nodes_created_from_data.emit(nodes)
+        self._emit(self.nodes_created_from_data, nodes)
 
         return nodes
 
@@ -108,12 +137,16 @@ class Flow(Base):
         """Stores a node object and causes the node's place_event()"""
 
         self.nodes.append(node)
-        self.node_successors[node] = []
+        self.node_successors[node] = {}
         node.after_placement()
-        self.flow_changed()
+        self.flow_changed([node])
 
         # self.emit_event('node added', (node,))    # ALPHA
-        self.node_added.emit(node)
+        self._emit(self.node_added, node)
+        if self._batch_depth > 0:
+            self._batch_nodes.append(node)
+        else:
+            self.nodes_created.emit([node])
 
 
     def node_view_placed(self, node: Node):
@@ -128,10 +161,10 @@ class Flow(Base):
         node.prepare_removal()
         self.nodes.remove(node)
         # del self.node_successors[node]
-        self.flow_changed()
+        self.flow_changed([node])
 
         # self.emit_event('node removed', (node,))    # ALPHA
-        self.node_removed.emit(node)
+        self._emit(self.node_removed, node)
 
 
     def connect_nodes_from_data(self, nodes: List[Node], data: List):
@@ -149,20 +182,25 @@ class Flow(Base):
                 connected_node = nodes[c_connected_node_index]
 
                 c = self.connect_nodes(parent_node.outputs[c_output_port_index],
-                                       connected_node.inputs[c_connected_input_port_index])
+                                       connected_node.inputs[c_connected_input_port_index],
+                                       feedback=c.get('feedback', False))
                 connections.append(c)
 
-        self.connections_created_from_data.emit(connections)
+        self._emit(self.connections_created_from_data, connections)
 
         return connections
 
 
-    def check_connection_validity(self, p1: NodePort, p2: NodePort) -> bool:
-        """Checks whether a considered connect action is legal"""
+    def check_connection_validity(self, p1: NodePort, p2: NodePort, feedback: bool = False) -> bool:
+        """Checks whether a considered connect action is legal; a node can only be connected to itself
+        through a feedback connection"""
 
         valid = True
 
-        if p1.node == p2.node:
+        if p1.node == p2.node and not (
+                feedback or any(isinstance(c, FeedbackConnection) and p2 in (c.out, c.inp) for c in p1.connections)
+        ):
+            # an existing feedback connection between the ports can still be disconnected
             valid = False
 
         if p1.io_pos == p2.io_pos or p1.type_ != p2.type_:
@@ -173,10 +211,11 @@ class Flow(Base):
         return valid
 
 
-    def connect_nodes(self, p1: NodePort, p2: NodePort) -> Connection:
-        """Connects nodes or disconnects them if they are already connected"""
+    def connect_nodes(self, p1: NodePort, p2: NodePort, feedback: bool = False) -> Connection:
+        """Connects nodes or disconnects them if they are already connected. A feedback connection
+        (see FeedbackConnection) delays its data by one tick, which is how data cycles are built."""
 
-        if not self.check_connection_validity(p1, p2):
+        if not self.check_connection_validity(p1, p2, feedback):
             return None
 
         out = p1
@@ -184,6 +223,10 @@ class Flow(Base):
         if out.io_pos == PortObjPos.INPUT:
             out, inp = inp, out
 
+        if feedback and out.type_ != 'data':
+            # only data can be delayed
+            return None
+
         for c in out.connections:
             if c.inp == inp:
                 # DISCONNECT
@@ -192,8 +235,11 @@ class Flow(Base):
 
         # c = self.session.CLASSES['data conn']((out, inp, self)) if out.type_ == 'data' else \
         #     self.session.CLASSES['exec conn']((out, inp, self))
-        c = DataConnection((out, inp, self)) if out.type_ == 'data' else \
-            ExecConnection((out, inp, self))
+        if feedback:
+            c = FeedbackConnection((out, inp, self))
+        else:
+            c = DataConnection((out, inp, self)) if out.type_ == 'data' else \
+                ExecConnection((out, inp, self))
 
         self.add_connection(c)
 
@@ -205,15 +251,23 @@ class Flow(Base):
 
         c.out.connections.append(c)
         c.inp.connections.append(c)
-        c.out.connected()
-        c.inp.connected()
         self.connections.append(c)
 
-        self.node_successors[c.out.node].append(c.inp.node)
-        self.flow_changed()
+        if not c.feedback:
+            successors = self.node_successors[c.out.node]
+            successors[c.inp.node] = successors.get(c.inp.node, 0) + 1
+        # invalidate before the ports are notified, connecting can already update the input's node
+        self.flow_changed([c.out.node])
+
+        c.out.connected()
+        c.inp.connected()
 
         # self.emit_event('connection added', (c,))    # ALPHA
-        self.connection_added.emit(c)
+        self._emit(self.connection_added, c)
+        if self._batch_depth > 0:
+            self._batch_connections.append(c)
+        else:
+            self.connections_created.emit([c])
 
 
     def remove_connection(self, c: Connection):
@@ -221,15 +275,116 @@ class Flow(Base):
 
         c.out.connections.remove(c)
         c.inp.connections.remove(c)
-        c.out.disconnected()
-        c.inp.disconnected()
         self.connections.remove(c)
 
-        self.node_successors[c.out.node].remove(c.inp.node)
-        self.flow_changed()
+        if not c.feedback:
+            successors = self.node_successors[c.out.node]
+            successors[c.inp.node] -= 1
+            if successors[c.inp.node] == 0:
+                del successors[c.inp.node]
+        self.flow_changed([c.out.node])
+
+        c.out.disconnected()
+        c.inp.disconnected()
 
         # self.emit_event('connection removed', (c,))    # ALPHA
-        self.connection_removed.emit(c)
+        self._emit(self.connection_removed, c)
+
+
+    @contextmanager
+    def batch_edit(self):
+        """
+        A context manager for building or changing larger parts of the flow at once, like
+
+            with flow.batch_edit():
+                ...
+
+        Inside, the updates nodes usually receive when their inputs get (dis)connected are deferred, and so
+        are the flow's events. When the outermost batch edit is left, the events are emitted in their original
+        order, followed by one nodes_created and one connections_created event, and the deferred updates run
+        in one combined execution, in which, in the optimized algorithm modes, every output is propagated at most
+        once. Also, the executors' graph analyses are just dropped on every change during a batch edit, instead
+        of searching for the affected ones, and they are not rebuilt before the combined execution.
+        """
+
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._commit_batch()
+
+
+    @contextmanager
+    def profile(self):
+        """
+        A context manager collecting statistics of the flow's node updates while it's active, like
+
+            with flow.profile() as profiler:
+                ...
+            print(profiler.table())
+
+        The Profiler counts calls, exceptions and connection activations and measures the time spent in
+        update_event() for every node, see Profiler.node_stats(), Profiler.class_stats() and
+        Profiler.critical_path(). Profiling uses the Tracer, so the updates are slower while it's active.
+        """
+
+        profiler = Profiler(self)
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+
+
+    def schedule_update(self, node: Node, inp: int = -1):
+        """Updates the node, or, during a batch edit, defers the update to the combined execution at its end.
+        A node whose updates are blocked right now won't receive the deferred update either."""
+
+        if self._batch_depth == 0:
+            node.update(inp)
+        elif not node.block_updates:
+            self._batch_updates[(node, inp)] = None
+
+
+    def _emit(self, event: Event, arg):
+        if self._batch_depth > 0:
+            self._batch_events.append((event, arg))
+        else:
+            event.emit(arg)
+
+
+    def _commit_batch(self):
+        events, self._batch_events = self._batch_events, []
+        updates, self._batch_updates = self._batch_updates, {}
+        nodes, self._batch_nodes = self._batch_nodes, []
+        connections, self._batch_connections = self._batch_connections, []
+
+        for event, arg in events:
+            event.emit(arg)
+
+        nodes = [n for n in nodes if n in self.nodes]
+        if len(nodes) > 0:
+            self.nodes_created.emit(nodes)
+        connections = [c for c in connections if c in self.connections]
+        if len(connections) > 0:
+            self.connections_created.emit(connections)
+
+        updates = [
+            (node, inp) for node, inp in updates
+            if node in self.nodes and not node.block_updates
+        ]
+        if len(updates) == 0:
+            return
+
+        if self.running_with_executor and self.alg_mode != FlowAlg.DATA_ITERATIVE:
+            self.executor.update_nodes(updates)
+        else:
+            # replaying the updates one after the other in data mode semantics would execute everything
+            # that comes after an updated node again and again, so the combined execution uses data opt
+            with self._using_executor(self.executor_data_opt):
+                self.executor_data_opt.update_nodes(updates)
 
 
     def algorithm_mode(self) -> str:
@@ -239,12 +394,18 @@ class Flow(Base):
 
 
     def set_algorithm_mode(self, mode: str):
-        """Sets the algorithm mode of the flow, possible values are 'data' and 'exec'"""
+        """Sets the algorithm mode of the flow, possible values are 'data', 'exec', 'data opt',
+        'data compiled', 'data parallel', 'data multiprocess', 'data async' and 'data iterative'"""
 
         new_alg_mode = FlowAlg.from_str(mode)
         if new_alg_mode is None:
             return False
 
+        if new_alg_mode != self.alg_mode and self.alg_mode in self.executors:
+            # release the worker pools of the previous executor, without waiting, as this can be called
+            # from a node running in one of them
+            self.executors[self.alg_mode].shutdown(wait=False)
+
         self.alg_mode = new_alg_mode
         self._update_running_with_executor()
         self.algorithm_mode_changed.emit(self.algorithm_mode())
@@ -252,18 +413,87 @@ class Flow(Base):
         return True
 
 
+    def shutdown(self):
+        """Releases the worker pools of the flow's executors, called when the script gets deleted.
+        The flow stays usable, the pools are recreated when needed."""
+
+        for executor in self.executors.values():
+            executor.shutdown()
+
+
+    async def run_async(self, node: Node, inp: int = -1):
+        """Updates a node and awaits the whole resulting execution. In 'data async' mode the execution runs
+        on the current event loop, which is useful for host applications that already run one; in all other
+        modes this is equivalent to node.update()."""
+
+        if self.alg_mode == FlowAlg.DATA_ASYNC:
+            if not node.block_updates:
+                await self.executor.execute_node(node, inp)
+        else:
+            node.update(inp)
+
+
+    def run_batch(self, root: NodeOutput, values) -> Dict[NodeOutput, list]:
+        """Pushes a whole batch of values (a list or an array) through the flow in one pass, starting at the data
+        output root. Nodes which set supports_batches get updated once with the whole batches in their inputs,
+        all others get updated once per sample. Each output is propagated at most once, like in 'data opt' mode.
+        Afterwards all affected ports hold the values of the last sample, as if the samples had been
+        set one after the other. Returns the batches of all outputs updated in the run.
+        The batch is always executed with data flow semantics, so values are pushed, never pulled."""
+
+        batch_executor = DataFlowBatch(self)
+        with self._using_executor(batch_executor):
+            return batch_executor.run_batch(root, values)
+
+
+    @contextmanager
+    def _using_executor(self, executor: FlowExecutor):
+        """temporarily runs the flow with another executor than the algorithm mode's"""
+
+        prev_executor = self.executor
+        prev_running_with_executor = self.running_with_executor
+
+        self.executor = executor
+        self.running_with_executor = True
+        try:
+            yield executor
+        finally:
+            self.executor = prev_executor
+            self.running_with_executor = prev_running_with_executor
+
+
     def _update_running_with_executor(self):
-        self.running_with_executor = self.alg_mode in (FlowAlg.DATA_OPT, )
+        self.running_with_executor = self.alg_mode in self.executors
 
         if self.running_with_executor:
-            if self.alg_mode == FlowAlg.DATA_OPT:
-                self.executor = self.executor_data_opt
+            self.executor = self.executors[self.alg_mode]
         else:
             self.executor = None
 
 
-    def flow_changed(self):
-        self.executor_data_opt.flow_changed = True
+    def cycles(self) -> List[List[Node]]:
+        """Returns the cycles in the flow which are not broken by a feedback connection, as the strongly
+        connected components with more than one node. The optimized algorithm modes can't execute those
+        properly, they cut one connection of every such cycle, depending on where the execution starts."""
+
+        return [
+            component
+            for component in strongly_connected_components(self.nodes, self.node_successors)
+            if len(component) > 1
+        ]
+
+
+    def flow_changed(self, nodes: List[Node] = None):
+        """Invalidates the executors' graph analyses affected by a structural change of the given nodes,
+        or all of them if no nodes are given. A connection only changes the analyses reaching its
+        output's node, which is why it's enough to pass that one."""
+
+        if self._batch_depth > 0:
+            # dropping all analyses is O(1), the next execution has to analyze the changed flow anyway
+            nodes = None
+
+        for executor in self.executors.values():
+            executor.invalidate(nodes)
 
 
     def data(self) -> dict:
@@ -288,25 +518,36 @@ class Flow(Base):
         # is generated always for a specific set of nodes (like all currently selected ones)
         # and the data dict therefore has the refer to the indices of the nodes in the nodes list
 
+        node_indices = {n: i for i, n in enumerate(nodes)}
+        input_indices = {}  # node -> input -> index, for the connected nodes
+
         data = []
-        for i in range(len(nodes)):
-            n = nodes[i]
-            for j in range(len(n.outputs)):
-                out = n.outputs[j]
+        for i, n in enumerate(nodes):
+            for j, out in enumerate(n.outputs):
                 for c in out.connections:
                     connected_port = c.inp
                     connected_node = connected_port.node
 
                     # ignore connections connecting to nodes not in the list
-                    if connected_node not in nodes:
+                    connected_node_index = node_indices.get(connected_node)
+                    if connected_node_index is None:
                         continue
 
-                    data.append({
+                    indices = input_indices.get(connected_node)
+                    if indices is None:
+                        indices = {inp: k for k, inp in enumerate(connected_node.inputs)}
+                        input_indices[connected_node] = indices
+
+                    c_data = {
                         'GID': c.GLOBAL_ID,
                         'parent node index': i,
                         'output port index': j,
-                        'connected node': nodes.index(connected_node),
-                        'connected input port index': connected_node.inputs.index(connected_port)
-                    })
+                        'connected node': connected_node_index,
+                        'connected input port index': indices[connected_port]
+                    }
+                    if c.feedback:
+                        c_data['feedback'] = True
+
+                    data.append(c_data)
 
         return data
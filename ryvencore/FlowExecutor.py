@@ -4,6 +4,16 @@ this module provides special FlowExecutors which take over most of the work and
 sophisticated and optimized flow execution.
 """
 
+import asyncio
+import contextvars
+import inspect
+import traceback
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from .InfoMsgs import InfoMsgs
+from .Tracer import Tracer
+
 
 class FlowExecutor:
     """
@@ -13,10 +23,29 @@ class FlowExecutor:
     def __init__(self, flow):
         self.flow = flow
 
+    # Flow.flow_changed() =>
+    def invalidate(self, nodes=None):
+        """called when the flow's structure changed, nodes being the affected nodes or None for all"""
+        pass
+
     # Node.update() =>
     def update_node(self, node, inp):
         pass
 
+    # Flow.set_algorithm_mode(), Flow.shutdown() =>
+    def shutdown(self, wait: bool = True):
+        """releases resources like worker pools when the executor isn't used anymore,
+        they are recreated if it is used again"""
+        pass
+
+    # Flow.batch_edit() =>
+    def update_nodes(self, updates):
+        """updates several nodes, updates being a list of (node, input index) tuples;
+        executors which can do this in one combined execution override it"""
+
+        for node, inp in updates:
+            node.update(inp)
+
     # Node.input() =>
     def input(self, node, index):
         pass
@@ -29,6 +58,299 @@ class FlowExecutor:
     def exec_output(self, node, index):
         pass
 
+    def invoke_node_update_event(self, node, inp):
+        try:
+            node.invoke_update_event(inp)
+        except Exception:
+            pass
+
+    def trace_execution(self, start):
+        """records the span of an execution which started at start, a Tracer timestamp"""
+
+        Tracer.span('execution', 'executor', start, {'executor': type(self).__name__, 'flow': self.flow.GLOBAL_ID})
+
+    def analyze(self, root_node=None, root_output=None, root_nodes=None):
+        """Traverses the graph reachable from the execution root (a Node or a NodeOutput, or a list of nodes)
+        depth-first and returns (waiting_count, nodes, delayed): the number of connections every reachable node
+        receives from reachable predecessors, the reachable nodes, and the connections which are not counted.
+        With a list of root nodes, every one of them gets one more count, for the execution itself. The latter are
+        the feedback connections and the connections closing a cycle, which get delayed like feedback connections,
+        so the wait counts of the nodes in a cycle still reach zero. Since which connection of a cycle that is
+        depends on where the execution starts, such cycles should be broken by a feedback connection."""
+
+        waiting_count = {}
+        nodes = set()
+        delayed = set()
+
+        if root_output is not None:
+            roots = [root_output.node]
+        elif root_node is not None:
+            roots = [root_node]
+        else:
+            roots = root_nodes
+            for r in root_nodes:
+                waiting_count[r] = waiting_count.get(r, 0) + 1
+
+        for root in roots:
+            if root in nodes:   # reached from a previous root
+                continue
+
+            if root_output is not None:
+                conns = iter(root_output.connections)
+            else:
+                nodes.add(root)
+                conns = (c for out in root.outputs for c in out.connections)
+
+            on_path = {root}
+            stack = [(root, conns)]
+
+            while len(stack) > 0:
+                n, it = stack[-1]
+                c = next(it, None)
+
+                if c is None:
+                    stack.pop()
+                    on_path.discard(n)
+                    continue
+
+                s = c.inp.node
+
+                if c.feedback:
+                    delayed.add(c)
+
+                elif s in on_path:
+                    InfoMsgs.write_err('cycle in flow, delaying the connection from', n.title, 'to', s.title,
+                                       '- use a feedback connection to close the cycle')
+                    delayed.add(c)
+
+                else:
+                    waiting_count[s] = waiting_count.get(s, 0) + 1
+                    if s not in nodes:
+                        nodes.add(s)
+                        on_path.add(s)
+                        stack.append((s, (c for out in s.outputs for c in out.connections)))
+
+        return waiting_count, nodes, delayed
+
+
+class ExecFlowCached(FlowExecutor):
+    """
+    The flow executor for exec flows. Data outputs are evaluated lazily in exec flows: pulling the value
+    of a data output (NodeOutput.get_val()) updates its node, which again pulls its inputs. Without a cache,
+    a data subgraph pulled along several paths, like a chain of diamonds, is evaluated once for every
+    path, which grows exponentially. This executor memoizes which nodes have already been evaluated in
+    the current exec activation, which is the execution of an exec output, or an update or pull invoked
+    from outside, so every node is evaluated at most once per activation.
+    Activations nested into another one, e.g. an exec output executed in every iteration of a loop, get
+    a new memo, so they see fresh values. Nodes which are currently being executed count as evaluated,
+    so pulling an output of a running node (e.g. the loop) returns its current value instead of updating it again.
+    """
+
+    def __init__(self, flow):
+        super().__init__(flow)
+
+        self.evaluated: set = None  # nodes evaluated in the current activation, None outside of activations
+        self.executing = []         # nodes whose update_event() is currently running
+
+    # NODE FUNCTIONS
+
+    # Node.update() =>
+    def update_node(self, node, inp=-1):
+        if self.evaluated is None:  # activation starter!
+            start = Tracer.now() if Tracer.enabled else None
+            self.evaluated = set()
+            try:
+                self.evaluate(node, inp)
+            finally:
+                self.evaluated = None
+                if start is not None:
+                    self.trace_execution(start)
+        else:
+            self.evaluate(node, inp)
+
+    # Node.input() =>
+    def input(self, node, index):
+        return node.inputs[index].get_val()
+
+    # Node.set_output_val() =>
+    def set_output_val(self, node, index, val):
+        node.outputs[index].set_val(val)
+
+    # Node.exec_output() =>
+    def exec_output(self, node, index):
+        outer = self.evaluated
+        self.evaluated = set(self.executing)
+        try:
+            node.outputs[index].exec()
+        finally:
+            self.evaluated = outer
+
+    # NodeOutput.get_val() =>
+    def pull_output(self, out):
+        node = out.node
+
+        if self.evaluated is None:  # activation starter!
+            start = Tracer.now() if Tracer.enabled else None
+            self.evaluated = set()
+            try:
+                node.update()
+            finally:
+                self.evaluated = None
+                if start is not None:
+                    self.trace_execution(start)
+
+        elif node not in self.evaluated:
+            node.update()
+
+        return out.val
+
+    # ----------------------------------------------------------
+
+    def evaluate(self, node, inp):
+        self.evaluated.add(node)
+        self.executing.append(node)
+        try:
+            self.invoke_node_update_event(node, inp)
+        finally:
+            self.executing.pop()
+
+    def invoke_node_update_event(self, node, inp):
+        try:
+            node.invoke_update_event(inp)
+        except Exception:
+            InfoMsgs.write_err('EXCEPTION in', node.title, '\n', traceback.format_exc())
+
+
+class DataFlowIterative(FlowExecutor):
+    """
+    A flow executor with the semantics of the default data mode, which drives the propagation from an explicit
+    stack instead of recursing through outputs, connections, inputs and nodes, which costs several Python frames
+    per node. When a node sets an output value or executes an exec output, the resulting activations of its
+    connections are recorded, and once its update_event() returned, they are processed depth-first, in the same
+    order as in data mode. The only difference to data mode is therefore that successors are updated after the
+    update_event() that set the value returned, instead of within it.
+    This way, the depth of a flow is not limited by Python's recursion limit. Where data mode would recurse
+    into a node whose update is still in progress, i.e. along a cycle which isn't closed by a feedback
+    connection, the connection closing the cycle gets delayed like a feedback connection instead, as in
+    analyze(), so the execution can't go on forever.
+    """
+
+    def __init__(self, flow):
+        super().__init__(flow)
+
+        self.activations = None     # [(connection, value), ...] recorded in the current update, None outside of executions
+
+    # NODE FUNCTIONS
+
+    # Node.update() =>
+    def update_node(self, node, inp=-1):
+        if self.activations is None:  # execution starter!
+            start = Tracer.now() if Tracer.enabled else None
+            self.activations = []
+            try:
+                self.invoke_node_update_event(node, inp)
+                self.run(node)
+            finally:
+                self.activations = None
+                if start is not None:
+                    self.trace_execution(start)
+        else:
+            self.invoke_node_update_event(node, inp)
+
+    # Node.input() =>
+    def input(self, node, index):
+        return node.inputs[index].get_val()
+
+    # Node.set_output_val() =>
+    def set_output_val(self, node, index, val):
+        out = node.outputs[index]
+
+        changed = out.val_changed(val)
+        out.val = val
+
+        if changed:
+            self.record(out, val)
+
+    # Node.exec_output() =>
+    def exec_output(self, node, index):
+        self.record(node.outputs[index], None)
+
+    # ----------------------------------------------------------
+
+    def record(self, out, val):
+        if self.activations is None:  # execution starter!
+            start = Tracer.now() if Tracer.enabled else None
+            self.activations = [(c, val) for c in out.connections]
+            try:
+                self.run(out.node)
+            finally:
+                self.activations = None
+                if start is not None:
+                    self.trace_execution(start)
+        else:
+            self.activations.extend((c, val) for c in out.connections)
+
+    def run(self, node):
+        """processes the recorded activations depth-first until there are none left, node being the node
+        which recorded the first ones"""
+
+        tracing = Tracer.enabled
+        if tracing:
+            start = Tracer.now()
+
+        stack = []      # [(node, activations recorded by the node's update), ...]
+        on_stack = {}   # node -> number of its entries in stack, the nodes whose updates are still in progress
+
+        while True:
+            if len(self.activations) > 0:
+                # the activations recorded by the last update are processed first
+                stack.append((node, iter(self.activations)))
+                on_stack[node] = on_stack.get(node, 0) + 1
+                self.activations = []
+
+            if len(stack) == 0:
+                break
+
+            n, activations = stack[-1]
+            activation = next(activations, None)
+            if activation is None:
+                stack.pop()
+                on_stack[n] -= 1
+                if on_stack[n] == 0:
+                    del on_stack[n]
+                continue
+
+            c, val = activation
+            inp = c.inp
+            if tracing:
+                activation_start = Tracer.now()
+            if c._activated is not None:
+                c._activated.emit(val)
+
+            if inp.type_ == 'data':
+                c.data = val
+                inp.val = val
+
+            node = inp.node
+            if not (c.feedback or node.block_updates):
+                if node in on_stack:
+                    InfoMsgs.write_err('cycle in flow, delaying the connection from', c.out.node.title, 'to',
+                                       node.title, '- use a feedback connection to close the cycle')
+                else:
+                    self.invoke_node_update_event(node, node.inputs.index(inp))
+
+            if tracing:
+                Tracer.span('activate', 'connection', activation_start, c.trace_args())
+
+        if tracing:
+            Tracer.span('propagation', 'executor', start, {'executor': type(self).__name__})
+
+    def invoke_node_update_event(self, node, inp):
+        try:
+            node.invoke_update_event(inp)
+        except Exception:
+            InfoMsgs.write_err('EXCEPTION in', node.title, '\n', traceback.format_exc())
+
 
 class DataFlowOptimized(FlowExecutor):
     """
@@ -45,20 +367,43 @@ class DataFlowOptimized(FlowExecutor):
     execution where any two executed branches which merge again in the future result in two
     complete executions of everything that comes after the merge, which quickly produces
     exponential performance issues.
+    The analyses are cached for the most recently used execution roots, and a structural change
+    of the flow only drops the analyses of roots which reach the changed nodes.
+    Feedback connections (and connections closing a cycle, see FlowExecutor.analyze()) don't count
+    as inputs a node waits for, their data is passed on without causing updates.
     """
 
+    analyses_cache_size = 32    # max number of execution roots whose analyses are cached
+
     def __init__(self, flow):
         super().__init__(flow)
 
         self.output_updated = {}
         self.waiting_count = {}
-        self.node_waiting = {}
+        self.node_waiting = set()
+        self.delayed = set()                # connections whose data is not waited for
         self.num_conns_from_predecessors = None
-        self.last_execution_root = None     # for reuse when a same execution is invoked many times consecutively
+        self.analyses = OrderedDict()       # LRU cache: execution root -> (root node, wait counts, node_waiting, delayed)
         self.execution_root = None          # can be Node or NodeOutput
         self.execution_root_node = None     # the updated Node or the updated NodeOutput's Node
+        self.execution_start = None         # Tracer timestamp of the current execution, if it's traced
         self.flow_changed = True
 
+    # Flow.flow_changed() =>
+    def invalidate(self, nodes=None):
+        if nodes is None:
+            self.flow_changed = True
+            return
+
+        if len(self.analyses) == 0:
+            return
+
+        for root, (root_node, _, node_waiting, _) in list(self.analyses.items()):
+            for n in nodes:
+                if n is root_node or n in node_waiting:
+                    del self.analyses[root]
+                    break
+
     # NODE FUNCTIONS
 
     # Node.update() =>
@@ -71,6 +416,20 @@ class DataFlowOptimized(FlowExecutor):
         else:
             self.invoke_node_update_event(node, inp)
 
+    # Flow.batch_edit() =>
+    def update_nodes(self, updates):
+        if self.execution_root_node is not None:
+            super().update_nodes(updates)
+            return
+
+        # one execution starting at all the nodes
+        roots = list(dict.fromkeys(node for node, _ in updates))
+        self.start_execution(root_nodes=roots)
+        for node, inp in updates:
+            self.invoke_node_update_event(node, inp)
+        self.propagate_roots(roots)
+        self.stop_execution()
+
     # Node.input() =>
     def input(self, node, index):
         return node.inputs[index].get_val()
@@ -80,6 +439,11 @@ class DataFlowOptimized(FlowExecutor):
         out = node.outputs[index]
 
         if self.execution_root_node is None:  # execution starter!
+            if not out.val_changed(val):
+                # nothing to propagate according to the output's change policy
+                out.val = val
+                return
+
             self.start_execution(root_output=out)
 
             out.val = val
@@ -90,7 +454,7 @@ class DataFlowOptimized(FlowExecutor):
 
         else:
 
-            if not self.node_waiting[out.node]:
+            if out.node not in self.node_waiting:
                 # the output's node might not be part of the analyzed graph!
                 # in this case we immediately push the value
                 # there are other possible solutions to this, including running
@@ -99,8 +463,10 @@ class DataFlowOptimized(FlowExecutor):
                 out.set_val(val)
 
             else:
+                # an unchanged value leaves the successors clean, they don't get updated
+                if out.val_changed(val):
+                    self.output_updated[out] = True
                 out.val = val
-                self.output_updated[out] = True
 
 
     # Node.exec_output() =>
@@ -120,13 +486,14 @@ class DataFlowOptimized(FlowExecutor):
 
     # ----------------------------------------------------------
 
-    def start_execution(self, root_node=None, root_output=None):
+    def start_execution(self, root_node=None, root_output=None, root_nodes=None):
+
+        if Tracer.enabled:
+            self.execution_start = Tracer.now()
 
-        # reset cached output values
+        # reset cached output values; only updated outputs are stored,
+        # so the per-execution state stays proportional to the work actually done
         self.output_updated = {}
-        for n in self.flow.nodes:
-            for out in n.outputs:
-                self.output_updated[out] = False
 
         if root_node is not None:
             self.execution_root = root_node
@@ -138,89 +505,980 @@ class DataFlowOptimized(FlowExecutor):
             self.execution_root_node = root_output.node
             self.waiting_count = self.generate_waiting_count(root_output=root_output)
 
+        elif root_nodes is not None:
+            self.execution_root = tuple(root_nodes)
+            self.execution_root_node = root_nodes[0]
+            self.waiting_count = self.generate_waiting_count(root_nodes=root_nodes)
+
     def stop_execution(self):
         self.execution_root_node = None
-        self.last_execution_root = self.execution_root
         self.execution_root = None
 
-    def generate_waiting_count(self, root_node=None, root_output=None):
-        if not self.flow_changed and self.execution_root is self.last_execution_root:
+        if self.execution_start is not None:
+            self.trace_execution(self.execution_start)
+            self.execution_start = None
+
+    def generate_waiting_count(self, root_node=None, root_output=None, root_nodes=None):
+        if self.flow_changed:
+            self.analyses.clear()
+            self.flow_changed = False
+
+        analysis = self.analyses.get(self.execution_root)
+        if analysis is not None:
+            self.analyses.move_to_end(self.execution_root)
+            _, self.num_conns_from_predecessors, self.node_waiting, self.delayed = analysis
             return self.num_conns_from_predecessors.copy()
-        self.flow_changed = False
 
-        nodes = self.flow.nodes
-        node_successors = self.flow.node_successors
+        start = Tracer.now() if Tracer.enabled else None
 
         # DP TABLE
-        self.num_conns_from_predecessors = {
-            n: 0
-            for n in nodes
-        }
-
-        successors = set()
-        visited = {
-            n: False
-            for n in nodes
-        }
-
-        # BC
-        if root_node is not None:
-            successors.add(root_node)
-        elif root_output is not None:
-            for c in root_output.connections:
-                connected_node = c.inp.node
-                self.num_conns_from_predecessors[connected_node] += 1
-                successors.add(connected_node)
-
-        # ITERATION
-        while len(successors) > 0:
-            n = successors.pop()
-            if visited[n]:
-                continue
+        #   only covers the nodes reachable from the root, not the whole flow
+        self.num_conns_from_predecessors, self.node_waiting, self.delayed = \
+            self.analyze(root_node=root_node, root_output=root_output, root_nodes=root_nodes)
 
-            for s in node_successors[n]:
-                self.num_conns_from_predecessors[s] += 1
-                successors.add(s)
-            visited[n] = True
+        if start is not None:
+            Tracer.span('analysis', 'executor', start,
+                        {'executor': type(self).__name__, 'nodes': len(self.node_waiting)})
 
-        self.node_waiting = visited
+        self.analyses[self.execution_root] = (
+            self.execution_root_node, self.num_conns_from_predecessors, self.node_waiting, self.delayed
+        )
+        if len(self.analyses) > self.analyses_cache_size:
+            self.analyses.popitem(last=False)
 
         return self.num_conns_from_predecessors.copy()
 
-    def invoke_node_update_event(self, node, inp):
-        try:
-            node.update_event(inp)
-        except Exception:
-            pass
-
-    def decrease_wait(self, node):
-        """decreases the wait count of the node;
-        if the count reaches zero, which means there is no other input waiting for data,
-        the output values get propagated"""
+    def propagate_roots(self, roots):
+        """decreases the wait counts of the root nodes of a multi-root execution by the count they received
+        for the execution itself, and propagates the outputs of those reaching zero"""
 
-        self.waiting_count[node] -= 1
-        if self.waiting_count[node] == 0:
-            self.propagate_outputs(node)
+        for node in roots:
+            self.waiting_count[node] -= 1
+            if self.waiting_count[node] == 0:
+                self.propagate_outputs(node)
 
     def propagate_outputs(self, node):
         """propagates all outputs of node"""
 
-        for out in node.outputs:
-            self.propagate_output(out)
+        self.propagate(iter(node.outputs))
 
     def propagate_output(self, out):
+        """propagates the output"""
+
+        self.propagate(iter((out,)))
+
+    def propagate(self, outputs):
+        """Propagates the outputs and, depth-first, the outputs of all successors whose wait count reaches
+        zero, which means there is no other input waiting for data. The stack holds iterators over either
+        outputs (is_out=True) or the connections whose successors' wait counts get decreased."""
+
+        start = Tracer.now() if Tracer.enabled else None
+
+        delayed = self.delayed
+        waiting_count = self.waiting_count
+        stack = [(True, outputs)]
+
+        while len(stack) > 0:
+            is_out, it = stack[-1]
+            item = next(it, None)
+
+            if item is None:
+                stack.pop()
+
+            elif is_out:
+                self.activate_output(item)
+                stack.append((False, iter(item.connections)))
+
+            elif item not in delayed:
+                n = item.inp.node
+                waiting_count[n] -= 1
+                if waiting_count[n] == 0:
+                    stack.append((True, iter(n.outputs)))
+
+        if start is not None:
+            Tracer.span('propagation', 'executor', start, {'executor': type(self).__name__})
+
+    def activate_output(self, out):
         """pushes an output's value to successors if it has been changed in the execution"""
 
-        if self.output_updated[out]:
+        delayed = self.delayed
+
+        if self.output_updated.get(out, False):
 
             if out.type_ == 'data':         # data output updated
                 for c in out.connections:
-                    c.activate(out.val)
+                    if c in delayed:
+                        self.delay(c, out.val)
+                    else:
+                        c.activate(out.val)
 
             else:                           # exec output executed
                 for c in out.connections:
-                    c.activate()
+                    if c not in delayed:
+                        c.activate()
+
+    def delay(self, c, val):
+        """passes data through a delayed connection without causing an update, like a FeedbackConnection"""
+
+        if c._activated is not None:
+            c._activated.emit(val)
+        c.data = val
+        c.inp.val = val
+
+
+class DataFlowCompiled(FlowExecutor):
+    """
+    A flow executor with the same semantics as DataFlowOptimized, but which does the whole graph
+    analysis ahead of time. For every execution root (a Node or a NodeOutput) it simulates the
+    propagation of DataFlowOptimized once and compiles the result into a topologically ordered
+    instruction list: one instruction per output that gets propagated, holding the precomputed
+    targets (connection, input, node, input index) of that output. Executing is then a flat loop
+    over this list, without wait counting, dict lookups or recursion. Connections' activated events
+    are looked up when the connections get activated, so they don't affect the plans.
+    Like DataFlowOptimized's analyses, compiled plans are cached for the most recently used
+    execution roots until the structure of the nodes they reach changes (see Flow.flow_changed()).
+    """
+
+    class Plan:
+        """A compiled execution plan for one execution root"""
+
+        def __init__(self, root_node, nodes: set, instructions: list, slots: dict):
+            self.root_node = root_node
+            # all nodes reachable from the root
+            self.nodes = nodes
+            # [(slot, output, is_data, ((connection, input, node, input index), ...)), ...]
+            #   where node is None for delayed connections (see FlowExecutor.analyze())
+            self.instructions = instructions
+            # output -> slot index into the per-execution updated flags
+            self.slots = slots
+
+    plans_cache_size = 32   # max number of execution roots whose plans are cached
+
+    def __init__(self, flow):
+        super().__init__(flow)
+
+        self.plans = OrderedDict()          # LRU cache: execution root (Node or NodeOutput) -> Plan
+        self.plan = None                    # the plan of the current execution
+        self.output_updated = None          # updated flags of the current execution, indexed by slot
+        self.execution_root_node = None
+        self.execution_start = None         # Tracer timestamp of the current execution, if it's traced
+        self.flow_changed = True
+
+    # Flow.flow_changed() =>
+    def invalidate(self, nodes=None):
+        if nodes is None:
+            self.flow_changed = True
+            return
+
+        if len(self.plans) == 0:
+            return
+
+        for root, plan in list(self.plans.items()):
+            for n in nodes:
+                if n is plan.root_node or n in plan.nodes:
+                    del self.plans[root]
+                    break
+
+    # NODE FUNCTIONS
+
+    # Node.update() =>
+    def update_node(self, node, inp=-1):
+        if self.execution_root_node is None:  # execution starter!
+            self.start_execution(root_node=node)
+            self.invoke_node_update_event(node, inp)
+            self.run()
+            self.stop_execution()
+        else:
+            self.invoke_node_update_event(node, inp)
+
+    # Flow.batch_edit() =>
+    def update_nodes(self, updates):
+        if self.execution_root_node is not None:
+            super().update_nodes(updates)
+            return
+
+        self.start_execution(root_nodes=list(dict.fromkeys(node for node, _ in updates)))
+        for node, inp in updates:
+            self.invoke_node_update_event(node, inp)
+        self.run()
+        self.stop_execution()
+
+    # Node.input() =>
+    def input(self, node, index):
+        return node.inputs[index].get_val()
+
+    # Node.set_output_val() =>
+    def set_output_val(self, node, index, val):
+        out = node.outputs[index]
+
+        if self.execution_root_node is None:  # execution starter!
+            if not out.val_changed(val):
+                out.val = val
+                return
+
+            self.start_execution(root_output=out)
+
+            out.val = val
+            self.output_updated[0] = True
+            self.run()
+
+            self.stop_execution()
+
+        else:
+            slot = self.plan.slots.get(out)
+
+            if slot is None:
+                # the output's node is not part of the compiled plan,
+                # so we immediately push the value, like DataFlowOptimized does
+                out.set_val(val)
+
+            else:
+                if out.val_changed(val):
+                    self.output_updated[slot] = True
+                out.val = val
+
+    # Node.exec_output() =>
+    def exec_output(self, node, index):
+        out = node.outputs[index]
+
+        if self.execution_root_node is None:  # execution starter!
+            self.start_execution(root_output=out)
+
+            self.output_updated[0] = True
+            self.run()
+
+            self.stop_execution()
+
+        else:
+            slot = self.plan.slots.get(out)
+            if slot is not None:
+                self.output_updated[slot] = True
+
+    # ----------------------------------------------------------
+
+    def start_execution(self, root_node=None, root_output=None, root_nodes=None):
+
+        if Tracer.enabled:
+            self.execution_start = Tracer.now()
+
+        if self.flow_changed:
+            self.plans.clear()
+            self.flow_changed = False
+
+        if root_node is not None:
+            root = root_node
+        elif root_output is not None:
+            root = root_output
+        else:
+            root = tuple(root_nodes)
+
+        plan = self.plans.get(root)
+        if plan is None:
+            start = Tracer.now() if Tracer.enabled else None
+            plan = self.compile(root_node=root_node, root_output=root_output, root_nodes=root_nodes)
+            if start is not None:
+                Tracer.span('analysis', 'executor', start,
+                            {'executor': type(self).__name__, 'nodes': len(plan.nodes)})
+            self.plans[root] = plan
+            if len(self.plans) > self.plans_cache_size:
+                self.plans.popitem(last=False)
+        else:
+            self.plans.move_to_end(root)
+
+        self.plan = plan
+        self.output_updated = [False] * len(plan.slots)
+        self.execution_root_node = plan.root_node
+
+    def stop_execution(self):
+        self.execution_root_node = None
+        self.plan = None
+        self.output_updated = None
+
+        if self.execution_start is not None:
+            self.trace_execution(self.execution_start)
+            self.execution_start = None
+
+    def run(self):
+        """executes the current plan"""
+
+        updated = self.output_updated
+
+        tracing = Tracer.enabled
+        if tracing:
+            start = Tracer.now()
+
+        for slot, out, is_data, targets in self.plan.instructions:
+            if not updated[slot]:
+                continue
+
+            if is_data:                     # data output updated
+                val = out.val
+                for c, inp, node, index in targets:
+                    if tracing:
+                        activation_start = Tracer.now()
+                    if c._activated is not None:
+                        c._activated.emit(val)
+                    c.data = val
+                    inp.val = val
+                    if node is not None and not node.block_updates:
+                        self.invoke_node_update_event(node, index)
+                    if tracing:
+                        Tracer.span('activate', 'connection', activation_start, c.trace_args())
+
+            else:                           # exec output executed
+                for c, inp, node, index in targets:
+                    if tracing:
+                        activation_start = Tracer.now()
+                    if c._activated is not None:
+                        c._activated.emit(None)
+                    if not node.block_updates:
+                        self.invoke_node_update_event(node, index)
+                    if tracing:
+                        Tracer.span('activate', 'connection', activation_start, c.trace_args())
+
+        if tracing:
+            Tracer.span('propagation', 'executor', start, {'executor': type(self).__name__})
+
+    def compile(self, root_node=None, root_output=None, root_nodes=None) -> Plan:
+        """Analyses the graph reachable from the root like DataFlowOptimized.generate_waiting_count() and
+        simulates DataFlowOptimized's propagation on it, recording the order in which outputs get propagated."""
+
+        # wait counts, i.e. number of connections from reachable predecessors
+        waiting_count, visited, delayed = \
+            self.analyze(root_node=root_node, root_output=root_output, root_nodes=root_nodes)
+
+        # simulation of DataFlowOptimized.propagate();
+        # the stack holds iterators over either outputs (is_out=True) or connections
+        instructions = []
+        slots = {}
+
+        if root_node is not None:
+            roots = [root_node]
+            outputs = [root_node.outputs]
+        elif root_output is not None:
+            roots = [root_output.node]
+            outputs = [(root_output,)]
+        else:
+            # like DataFlowOptimized.propagate_roots()
+            roots = root_nodes
+            outputs = (r.outputs for r in root_nodes if self.decrease(waiting_count, r))
+
+        for root_outputs in outputs:
+            stack = [(True, iter(root_outputs))]
+
+            while len(stack) > 0:
+                is_out, it = stack[-1]
+                item = next(it, None)
+
+                if item is None:
+                    stack.pop()
+
+                elif is_out:
+                    out = item
+                    slot = len(slots)
+                    slots[out] = slot
+                    is_data = out.type_ == 'data'
+                    targets = tuple(
+                        (c, c.inp, None if c in delayed else c.inp.node, c.inp.node.inputs.index(c.inp))
+                        for c in out.connections
+                        if is_data or c not in delayed
+                    )
+                    instructions.append((slot, out, is_data, targets))
+                    stack.append((False, iter(out.connections)))
+
+                elif item not in delayed:
+                    n = item.inp.node
+                    if self.decrease(waiting_count, n):
+                        stack.append((True, iter(n.outputs)))
+
+        return self.Plan(roots[0], visited, instructions, slots)
+
+    @staticmethod
+    def decrease(waiting_count, node) -> bool:
+        """decreases the wait count of node and returns whether it reached zero"""
+
+        waiting_count[node] -= 1
+        return waiting_count[node] == 0
+
+
+class DataFlowParallel(DataFlowOptimized):
+    """
+    A flow executor based on DataFlowOptimized's analysis which runs independent branches concurrently.
+    Instead of invoking a node's update_event() right when one of its inputs gets activated, the
+    activations are recorded, and once the node's wait count reaches zero, i.e. all its predecessors
+    have finished, the node becomes ready and all its recorded activations are processed at once.
+    Ready nodes whose class sets Node.parallel_safe run on a thread pool, all others run on the
+    thread that started the execution. This pays off for nodes that release the GIL (NumPy, I/O, ...).
+    Like in DataFlowOptimized every output is propagated at most once per execution; the order in
+    which independent nodes are updated is not defined though. The thread pool is created on first use
+    and shut down when the flow switches to another algorithm mode or its script gets deleted.
+    """
+
+    max_workers: int = None     # None means the ThreadPoolExecutor default
+
+    def __init__(self, flow):
+        super().__init__(flow)
+
+        self.pool: ThreadPoolExecutor = None
+        self.activations = {}   # node -> [(connection, value), ...] received in the current execution
+        self.ready = deque()    # nodes whose predecessors have all finished
+        self.running = {}       # future -> node
+
+    def get_pool(self) -> ThreadPoolExecutor:
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self.pool
+
+    def shutdown(self, wait: bool = True):
+        """Shuts down the thread pool, it will be recreated when needed"""
+
+        if self.pool is not None:
+            self.pool.shutdown(wait=wait)
+            self.pool = None
+
+    # ----------------------------------------------------------
+
+    # the following are only called from DataFlowOptimized for the execution root
+
+    def propagate_outputs(self, node):
+        self.release(node)
+        self.run()
+
+    def propagate_output(self, out):
+        self.release_output(out)
+        self.run()
+
+    def propagate_roots(self, roots):
+        for node in roots:
+            self.waiting_count[node] -= 1
+            if self.waiting_count[node] == 0:
+                self.ready.append(node)
+        self.run()
+
+    # ----------------------------------------------------------
+
+    def stop_execution(self):
+        super().stop_execution()
+        self.activations = {}
+
+    def run(self):
+        """processes ready nodes until all reachable nodes have finished"""
+
+        start = Tracer.now() if Tracer.enabled else None
+
+        ready = self.ready
+        running = self.running
+
+        while len(ready) > 0 or len(running) > 0:
+
+            while len(ready) > 0:
+                node = ready.popleft()
+                activations = self.activations.pop(node, None)
+
+                if activations is None:
+                    # no input received data, the node only passes the wait counts on
+                    self.release(node)
+                    continue
+
+                future = self.dispatch(node, activations)
+                if future is None:
+                    self.release(node)
+                else:
+                    running[future] = node
+
+            if len(running) > 0:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self.complete(running.pop(future), future)
+
+        if start is not None:
+            Tracer.span('propagation', 'executor', start, {'executor': type(self).__name__})
+
+    def dispatch(self, node, activations):
+        """processes a ready node, either right away or asynchronously, in which case the future is returned"""
+
+        if node.parallel_safe:
+            return self.get_pool().submit(self.process, node, activations)
+
+        self.process(node, activations)
+        return None
+
+    def complete(self, node, future):
+        """called once the future of a node returned by dispatch() is done"""
+
+        future.result()
+        self.release(node)
+
+    def process(self, node, activations):
+        """updates the node once for every recorded activation of one of its inputs"""
+
+        tracing = Tracer.enabled
+
+        for c, val in activations:
+            if tracing:
+                activation_start = Tracer.now()
+
+            inp = c.inp
+            if inp.type_ == 'data':
+                inp.val = val
+
+            if not node.block_updates:
+                self.invoke_node_update_event(node, node.inputs.index(inp))
+
+            if tracing:
+                Tracer.span('activate', 'connection', activation_start, c.trace_args())
+
+    def release(self, node):
+        """propagates all outputs of a finished node"""
+
+        for out in node.outputs:
+            self.release_output(out)
+
+    def release_output(self, out):
+        """records the activations of an output's connections if it has been changed in the execution,
+        and decreases the wait counts of its successors"""
+
+        if self.output_updated.get(out, False):
+
+            is_data = out.type_ == 'data'
+            val = out.val if is_data else None
+
+            for c in out.connections:
+                if c in self.delayed:
+                    if is_data:
+                        self.delay(c, val)
+                    continue
+
+                if c._activated is not None:
+                    c._activated.emit(val)
+                if is_data:
+                    c.data = val
+
+                node = c.inp.node
+                if node in self.activations:
+                    self.activations[node].append((c, val))
+                else:
+                    self.activations[node] = [(c, val)]
 
-        # decrease wait count of successors
         for c in out.connections:
-            self.decrease_wait(c.inp.node)
+            if c in self.delayed:
+                continue
+
+            node = c.inp.node
+            self.waiting_count[node] -= 1
+            if self.waiting_count[node] == 0:
+                self.ready.append(node)
+
+
+# node classes of a worker process of DataFlowMultiprocess, by identifier
+_worker_node_classes = {}
+
+
+def _init_worker(node_classes):
+    """initializer of DataFlowMultiprocess' worker processes, imports the node classes once"""
+
+    for identifier, node_class in node_classes:
+        _worker_node_classes[identifier] = node_class
+
+
+def _compute(identifier, inputs, state):
+    return _worker_node_classes[identifier].compute(inputs, state)
+
+
+class DataFlowMultiprocess(DataFlowParallel):
+    """
+    Extends DataFlowParallel by a pool of worker processes for CPU-bound nodes, which threads can't
+    speed up. Ready nodes whose class sets Node.process_safe don't get their update_event() invoked;
+    instead, the values of their inputs and their get_state() are sent to a worker process which runs
+    the node class' compute() and sends back the new output values, which are then propagated like
+    in DataFlowOptimized.
+    The workers are persistent (until the flow switches to another algorithm mode or its script gets
+    deleted) and keep the process safe node classes registered in the session, so dispatching a node doesn't import or instantiate anything. When a node class gets registered
+    later, the pool is restarted on its next use, nodes whose classes aren't registered are computed in
+    this process. Node classes need to be importable in the worker processes, i.e. not be defined in
+    __main__ when processes are spawned instead of forked.
+    """
+
+    max_processes: int = None   # None means the ProcessPoolExecutor default
+
+    def __init__(self, flow):
+        super().__init__(flow)
+
+        self.process_pool: ProcessPoolExecutor = None
+        self.process_pool_identifiers = set()
+        self.unknown_identifiers = set()    # of process safe nodes whose classes aren't registered
+        self.registry_size = None           # number of registered node classes, see restart_process_pool()
+
+    def process_safe_classes(self) -> list:
+        """returns [(identifier, node class), ...] of the process safe node classes registered in the session"""
+
+        session = self.flow.session
+        return [
+            (nc.identifier, nc)
+            for nc in session.nodes + session.invisible_nodes
+            if nc.process_safe
+        ]
+
+    def get_process_pool(self) -> ProcessPoolExecutor:
+        if self.process_pool is None:
+            node_classes = self.process_safe_classes()
+            self.process_pool = ProcessPoolExecutor(
+                max_workers=self.max_processes,
+                initializer=_init_worker,
+                initargs=(node_classes,),
+            )
+            self.process_pool_identifiers = {identifier for identifier, _ in node_classes}
+
+        return self.process_pool
+
+    def shutdown(self, wait: bool = True):
+        """Shuts down the thread and process pools, they will be recreated when needed"""
+
+        super().shutdown(wait)
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=wait)
+            self.process_pool = None
+
+    # ----------------------------------------------------------
+
+    def dispatch(self, node, activations):
+        if not node.process_safe:
+            return super().dispatch(node, activations)
+
+        for c, val in activations:
+            if c.inp.type_ == 'data':
+                c.inp.val = val
+
+        inputs = [
+            node.input(i) if node.inputs[i].type_ == 'data' else None
+            for i in range(len(node.inputs))
+        ]
+        state = node.get_state()
+
+        identifier = node.identifier
+        if identifier not in self.process_pool_identifiers and not self.restart_process_pool(identifier):
+            # the node's class is not registered in the session, compute in this process
+            self.set_computed_outputs(node, type(node).compute(inputs, state))
+            return None
+
+        return self.get_process_pool().submit(_compute, identifier, inputs, state)
+
+    def restart_process_pool(self, identifier) -> bool:
+        """Restarts the process pool if the node class with the identifier has been registered since the pool
+        was started, and returns whether it was. Identifiers of classes which aren't registered are remembered
+        until the registered node classes change, so they don't need to be looked up on every dispatch."""
+
+        session = self.flow.session
+        registry_size = len(session.nodes) + len(session.invisible_nodes)
+        if registry_size != self.registry_size:
+            self.registry_size = registry_size
+            self.unknown_identifiers.clear()
+        elif identifier in self.unknown_identifiers:
+            return False
+
+        if identifier not in {i for i, _ in self.process_safe_classes()}:
+            self.unknown_identifiers.add(identifier)
+            return False
+
+        # the old pool finishes the work still in flight without being waited for
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=False)
+            self.process_pool = None
+        self.get_process_pool()
+        return True
+
+    def complete(self, node, future):
+        if not node.process_safe:
+            super().complete(node, future)
+            return
+
+        try:
+            self.set_computed_outputs(node, future.result())
+        except Exception as e:
+            InfoMsgs.write_err('EXCEPTION in', node.title, 'compute():', e)
+
+        self.release(node)
+
+    def set_computed_outputs(self, node, outputs: dict):
+        for index, val in outputs.items():
+            out = node.outputs[index]
+            if out.val_changed(val):
+                self.output_updated[out] = True
+            out.val = val
+
+
+# the DataFlowAsync executor whose execution the current context (task) belongs to
+_async_execution = contextvars.ContextVar('_async_execution', default=None)
+
+
+class DataFlowAsync(DataFlowParallel):
+    """
+    An asyncio based flow executor following DataFlowParallel's scheduling, where update_event()
+    can be a coroutine function. Ready nodes with an async update_event() are run as tasks on the
+    event loop, ready nodes which set Node.parallel_safe run in the thread pool, all other nodes run
+    directly on the loop. As in DataFlowOptimized, every output is propagated at most once per execution.
+    Executions of the same flow don't overlap, they run one after the other. An execution invoked
+    while an event loop is running in the current thread (e.g. by Node.update()) is scheduled as a
+    task on that loop, otherwise it runs in a new loop until it's finished. Host applications running
+    an event loop can also await executions directly using Flow.run_async().
+    """
+
+    def __init__(self, flow):
+        super().__init__(flow)
+
+        self.lock: asyncio.Lock = None
+        self.lock_loop = None
+        self.tasks = set()          # scheduled executions
+        self.awaitables = []        # coroutines returned by update_event() outside of a ready node's task
+
+    # NODE FUNCTIONS
+
+    # Node.update() =>
+    def update_node(self, node, inp=-1):
+        if _async_execution.get() is not self:  # execution starter!
+            self.schedule(self.execute_node(node, inp))
+        else:
+            self.invoke_node_update_event(node, inp)
+
+    # Flow.batch_edit() =>
+    def update_nodes(self, updates):
+        # executions are scheduled one after the other
+        FlowExecutor.update_nodes(self, updates)
+
+    # Node.set_output_val() =>
+    def set_output_val(self, node, index, val):
+        if _async_execution.get() is not self:  # execution starter!
+            self.schedule(self.execute_output(node.outputs[index], val))
+        else:
+            super().set_output_val(node, index, val)
+
+    # Node.exec_output() =>
+    def exec_output(self, node, index):
+        if _async_execution.get() is not self:  # execution starter!
+            self.schedule(self.execute_output(node.outputs[index]))
+        else:
+            super().exec_output(node, index)
+
+    def invoke_node_update_event(self, node, inp):
+        try:
+            result = node.invoke_update_event(inp)
+        except Exception:
+            return
+
+        if inspect.isawaitable(result):
+            self.awaitables.append(result)
+
+    # ----------------------------------------------------------
+
+    def schedule(self, coro):
+        """runs an execution on the event loop running in this thread, or in a new one if there is none"""
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(coro)
+            return
+
+        task = loop.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self.lock is None or self.lock_loop is not loop:
+            self.lock = asyncio.Lock()
+            self.lock_loop = loop
+        return self.lock
+
+    async def execute_node(self, node, inp=-1):
+        """runs an execution starting with an update of node"""
+
+        async with self.get_lock():
+            token = _async_execution.set(self)
+            try:
+                self.start_execution(root_node=node)
+                self.invoke_node_update_event(node, inp)
+                await self.await_awaitables()
+                self.release(node)
+                await self.run_async()
+            finally:
+                self.stop_execution()
+                _async_execution.reset(token)
+
+    async def execute_output(self, out, val=None):
+        """runs an execution starting with an update of a data output or the execution of an exec output"""
+
+        async with self.get_lock():
+            if out.type_ == 'data' and not out.val_changed(val):
+                out.val = val
+                return
+
+            token = _async_execution.set(self)
+            try:
+                self.start_execution(root_output=out)
+                if out.type_ == 'data':
+                    out.val = val
+                self.output_updated[out] = True
+                self.release_output(out)
+                await self.run_async()
+            finally:
+                self.stop_execution()
+                _async_execution.reset(token)
+
+    async def await_awaitables(self):
+        while len(self.awaitables) > 0:
+            awaitables = self.awaitables
+            self.awaitables = []
+            for a in awaitables:
+                try:
+                    await a
+                except Exception:
+                    pass
+
+    async def run_async(self):
+        """processes ready nodes until all reachable nodes have finished"""
+
+        start = Tracer.now() if Tracer.enabled else None
+
+        loop = asyncio.get_running_loop()
+        ready = self.ready
+        running = {}    # task or future -> node
+
+        while len(ready) > 0 or len(running) > 0:
+
+            while len(ready) > 0:
+                node = ready.popleft()
+                activations = self.activations.pop(node, None)
+
+                if activations is None:
+                    self.release(node)
+
+                elif inspect.iscoroutinefunction(node.update_event):
+                    running[loop.create_task(self.process_async(node, activations))] = node
+
+                elif node.parallel_safe:
+                    context = contextvars.copy_context()
+                    running[loop.run_in_executor(
+                        self.get_pool(), context.run, self.process, node, activations
+                    )] = node
+
+                else:
+                    self.process(node, activations)
+                    await self.await_awaitables()
+                    self.release(node)
+
+            if len(running) > 0:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    node = running.pop(future)
+                    future.result()
+                    self.release(node)
+
+        await self.await_awaitables()
+
+        if start is not None:
+            Tracer.span('propagation', 'executor', start, {'executor': type(self).__name__})
+
+    async def process_async(self, node, activations):
+        """like process(), awaiting the node's update_event() for every activation"""
+
+        for c, val in activations:
+            inp = c.inp
+            if inp.type_ == 'data':
+                inp.val = val
+
+            if not node.block_updates:
+                try:
+                    result = node.invoke_update_event(node.inputs.index(inp))
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception:
+                    pass
+
+
+class DataFlowBatch(DataFlowParallel):
+    """
+    Used by Flow.run_batch() to push a batch of samples through the flow in one execution, following
+    DataFlowParallel's scheduling but processing every node right away. During the execution, every
+    propagated value is a whole batch (a list, or whatever the nodes supporting batches return, for
+    example NumPy arrays). Nodes with Node.supports_batches get the batches in their inputs and are
+    updated as usual, all other nodes are updated once per sample and their outputs are collected into lists.
+    A node supporting batches can also reduce a batch to a single value for the whole batch (e.g. a sum),
+    which is anything but a sequence of one value per sample, see is_batch(), and gets passed on to every
+    sample of the nodes not supporting batches.
+    """
+
+    def __init__(self, flow):
+        super().__init__(flow)
+
+        self.size = 0   # number of samples in the batch
+
+    # Node.input() =>
+    def input(self, node, index):
+        return node.inputs[index].val
+
+    def run_batch(self, root, values) -> dict:
+        self.size = len(values)
+        if self.size == 0:
+            return {}
+
+        self.start_execution(root_output=root)
+        try:
+            root.val = values
+            self.output_updated[root] = True
+            self.release_output(root)
+            self.run()
+        finally:
+            batches = {
+                out: out.val
+                for out, updated in self.output_updated.items()
+                if updated and out.type_ == 'data'
+            }
+            self.stop_execution()
+
+            # leave the ports in the state of the last sample, also if the execution failed
+            for out, batch in batches.items():
+                last = batch[-1] if self.is_batch(batch) else batch
+                out.val = last
+                for c in out.connections:
+                    c.data = last
+                    c.inp.val = last
+
+        return batches
+
+    def is_batch(self, val) -> bool:
+        """whether val holds one value per sample, and not a single value for the whole batch"""
+
+        if isinstance(val, (str, bytes, dict)):
+            return False
+        try:
+            return len(val) == self.size and hasattr(val, '__getitem__')
+        except TypeError:   # no sequence, like a number or a 0-dimensional array
+            return False
+
+    def dispatch(self, node, activations):
+        if node.supports_batches:
+            self.process(node, activations)
+            return None
+
+        outputs = [out for out in node.outputs if out.type_ == 'data']
+        samples = {out: [] for out in outputs}
+        is_batch = [self.is_batch(batch) for _, batch in activations]
+
+        for i in range(self.size):
+            for (c, batch), per_sample in zip(activations, is_batch):
+                inp = c.inp
+                if inp.type_ == 'data':
+                    inp.val = batch[i] if per_sample else batch
+
+                if not node.block_updates:
+                    self.invoke_node_update_event(node, node.inputs.index(inp))
+
+            for out in outputs:
+                samples[out].append(out.val)
+
+        for out in outputs:
+            if self.output_updated.get(out, False):
+                out.val = samples[out]
+
+        return None
@@ -26,13 +26,11 @@ class InfoMsgs:
 
     @staticmethod
     def write(*args):
+        # called in hot paths, callers there check InfoMsgs.enabled themselves to avoid the call
         if not InfoMsgs.enabled:
             return
 
-        s = ''
-        for arg in args:
-            s += ' '+str(arg)
-        print('--> INFO: '+s)
+        print('--> INFO: ' + ''.join(' ' + str(arg) for arg in args))
 
     @staticmethod
     def write_err(*args):
@@ -0,0 +1,79 @@
+from collections import OrderedDict
+
+
+class MemoCache:
+    """
+    A bounded cache for the output values of pure nodes (see Node.pure), owned by the Session.
+    Entries are keyed by the node class together with the node's input values and state, and hold the
+    output values the node set when it was updated with those. When the cache is full, the least recently
+    used entry ('lru') or the oldest entry ('fifo') gets evicted. A max_size of 0 disables the cache.
+    """
+
+    EVICTION_POLICIES = ('lru', 'fifo')
+
+    def __init__(self, max_size: int = 1024, eviction: str = 'lru'):
+        if eviction not in self.EVICTION_POLICIES:
+            raise Exception(f'unknown eviction policy \'{eviction}\'')
+
+        self.max_size = max_size
+        self.eviction = eviction
+        self.entries = OrderedDict()
+
+        # statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Returns the cached output values for key, or None, and counts the hit or miss"""
+
+        outputs = self.entries.get(key)
+
+        if outputs is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            if self.eviction == 'lru':
+                self.entries.move_to_end(key)
+
+        return outputs
+
+    def put(self, key, outputs: list):
+        """Stores the output values, a list of (output index, value) tuples, for key"""
+
+        if self.max_size <= 0:
+            return
+
+        self.entries[key] = outputs
+        self.entries.move_to_end(key)
+        self._evict()
+
+    def resize(self, max_size: int):
+        """Sets the maximum number of entries, evicting entries if necessary"""
+
+        self.max_size = max_size
+        self._evict()
+
+    def clear(self):
+        """Removes all entries and resets the statistics"""
+
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'max size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit rate': self.hits / lookups if lookups > 0 else 0.0,
+        }
+
+    def _evict(self):
+        while len(self.entries) > max(self.max_size, 0):
+            self.entries.popitem(last=False)
+            self.evictions += 1
@@ -1,4 +1,6 @@
+import inspect
 import logging
+import pickle
 import traceback
 from typing import List, Dict
 
@@ -9,6 +11,7 @@ from .NodePort import NodeInput, NodeOutput
 from .NodePortBP import NodeInputBP, NodeOutputBP
 from .dtypes import DType
 from .InfoMsgs import InfoMsgs
+from .Tracer import Tracer
 from .logging import Logger
 from .utils import serialize, deserialize
 
@@ -31,6 +34,14 @@ class Node(Base):
             on register
         static identifier_comp: a list of compatible identifiers, useful if you change the class name (and hence
             the identifier) to provide backward compatibility to older projects
+        static parallel_safe: whether update_event() may run in a worker thread, concurrently to other nodes,
+            when the flow runs in 'data parallel' mode
+        static process_safe: whether the node implements compute(), which then replaces update_event() in
+            a worker process when the flow runs in 'data multiprocess' mode
+        static supports_batches: whether the node can process whole batches of samples, see Flow.run_batch()
+        static pure: whether the output values only depend on the input values and the state (get_state()),
+            in which case they are memoized in the session's memo cache and update_event() is only invoked
+            for input values and states that are not cached
     """
 
     title = ''
@@ -46,6 +57,11 @@ class Node(Base):
     identifier_comp: List[str] = []  # identifier (backwards) compatibility, useful when node class name changes
     identifier_prefix: str = None  # becomes part of identifier if set, often useful
 
+    parallel_safe: bool = False  # opt-in for concurrent execution in worker threads, see FlowAlg.DATA_PARALLEL
+    process_safe: bool = False  # opt-in for running compute() in worker processes, see FlowAlg.DATA_MULTIPROCESS
+    supports_batches: bool = False  # if set, inputs and outputs hold whole batches in Flow.run_batch()
+    pure: bool = False  # opt-in for memoization of the output values, see Session.memo_cache
+
     """
     INITIALIZATION -----------------------------------------------------------------------------------------------------
     """
@@ -81,6 +97,9 @@ class Node(Base):
         self.block_init_updates = False
         self.block_updates = False
 
+        # output values set during update_event(), recorded for the memo cache if the node is pure
+        self._memo_outputs = None
+
     def initialize(self):
         """
         Loads all default properties from initial data if it was provided,
@@ -137,7 +156,7 @@ class Node(Base):
 
             for o in range(len(self.init_outputs)):
                 out = self.init_outputs[o]
-                self.create_output(out.label, out.type_)
+                self.create_output(out.label, out.type_, change_policy=out.change_policy)
 
         else:
             # load from data
@@ -156,8 +175,18 @@ class Node(Base):
                     # in the front end which has probably overridden the Node.input() method
                     self.inputs[-1].val = deserialize(inp['val'])
 
-            for out in outputs_data:
-                self.create_output(out['label'], out['type'])
+            for o in range(len(outputs_data)):
+                out = outputs_data[o]
+
+                # custom hash functions are not saved, they are taken from the initial outputs
+                if 'change policy' in out:
+                    change_policy = out['change policy']
+                elif o < len(self.init_outputs):
+                    change_policy = self.init_outputs[o].change_policy
+                else:
+                    change_policy = None
+
+                self.create_output(out['label'], out['type'], change_policy=change_policy)
 
     def after_placement(self):
         """Called from Flow when the nodes gets added"""
@@ -184,26 +213,96 @@ class Node(Base):
         the application from crashing in such a case"""
 
         if self.block_updates:
-            InfoMsgs.write('update blocked in', self.title, 'node')
+            if InfoMsgs.enabled:
+                InfoMsgs.write('update blocked in', self.title, 'node')
             return
 
-        InfoMsgs.write('update in', self.title, 'node on input', inp)
+        if InfoMsgs.enabled:
+            InfoMsgs.write('update in', self.title, 'node on input', inp)
 
         # invoke update_event
         if self.flow.running_with_executor:
             self.flow.executor.update_node(self, inp)
         else:
+            # the update starting an execution in data mode gets traced like the executors' executions
+            starter = Tracer.enabled and self.flow.execution_start is None
+            if starter:
+                self.flow.execution_start = Tracer.now()
             try:
-                self.update_event(inp)
+                self.invoke_update_event(inp)
             except Exception as e:
                 InfoMsgs.write_err('EXCEPTION in', self.title, '\n', traceback.format_exc())
+            finally:
+                if starter:
+                    Tracer.span('execution', 'flow', self.flow.execution_start, {'flow': self.flow.GLOBAL_ID})
+                    self.flow.execution_start = None
+
+    def invoke_update_event(self, inp=-1):
+        """Invokes update_event() and returns its result. For pure nodes, the output values are looked up in
+        the session's memo cache first, and if they are found, they are set again instead."""
+
+        if Tracer.enabled:
+            return self._invoke_traced_update_event(inp)
+
+        if self.pure:
+            return self._invoke_memoized_update_event(inp)
+        return self.update_event(inp)
+
+    def _invoke_traced_update_event(self, inp):
+        start = Tracer.now()
+        args = {'node': self.GLOBAL_ID, 'input': inp}
+        try:
+            if self.pure:
+                return self._invoke_memoized_update_event(inp)
+            return self.update_event(inp)
+        except BaseException:
+            args['exception'] = True
+            raise
+        finally:
+            Tracer.span(self.title or type(self).__name__, 'node', start, args)
+
+    def _invoke_memoized_update_event(self, inp):
+        key = self._memo_key()
+        if key is None:     # unpicklable inputs or state
+            return self.update_event(inp)
+
+        cache = self.session.memo_cache
+        outputs = cache.get(key)
+        if outputs is not None:
+            for index, val in outputs:
+                self.set_output_val(index, val)
+            return None
+
+        self._memo_outputs = []
+        try:
+            result = self.update_event(inp)
+        finally:
+            outputs = self._memo_outputs
+            self._memo_outputs = None
+
+        # exec signals (outputs is None) and coroutines can't be replayed
+        if outputs is not None and not inspect.isawaitable(result):
+            cache.put(key, outputs)
+
+        return result
+
+    def _memo_key(self):
+        inputs = [
+            self.input(i) if self.inputs[i].type_ == 'data' else None
+            for i in range(len(self.inputs))
+        ]
+        try:
+            return type(self), pickle.dumps((inputs, self.get_state()))
+        except Exception:
+            return None
 
     def input(self, index: int):
         """Returns the value of a data input.
         If the input is connected, the value of the connected output is used:
         If not, the value of the widget is used."""
 
-        InfoMsgs.write('input called in', self.title, 'Node:', index)
+        if InfoMsgs.enabled:
+            InfoMsgs.write('input called in', self.title, 'Node:', index)
 
         if self.flow.running_with_executor:
             return self.flow.executor.input(self, index)
@@ -212,6 +311,7 @@ class Node(Base):
 
     def exec_output(self, index: int):
         """Executes an exec output, causing activation of all connections"""
+        self._memo_outputs = None
         if self.flow.running_with_executor:
             self.flow.executor.exec_output(self, index)
         else:
@@ -219,6 +319,8 @@ class Node(Base):
 
     def set_output_val(self, index, val):
         """Sets the value of a data output causing activation of all connections in data mode"""
+        if self._memo_outputs is not None:
+            self._memo_outputs.append((index, val))
         if self.flow.running_with_executor:
             self.flow.executor.set_output_val(self, index, val)
         else:
@@ -232,11 +334,23 @@ class Node(Base):
 
     def update_event(self, inp=-1):
         """
-        Gets called when an input received a signal or some node requested data of an output in exec mode
+        Gets called when an input received a signal or some node requested data of an output in exec mode.
+        In 'data async' mode, this can also be a coroutine function (async def).
         """
 
         pass
 
+    @classmethod
+    def compute(cls, inputs: list, state: dict) -> dict:
+        """
+        Side-effect-free counterpart of update_event() for nodes that set process_safe. In 'data multiprocess'
+        mode it gets called in a worker process with the values of all inputs (None for exec inputs) and the
+        node's get_state(), and returns the new output values as {output index: value}. As it runs on the class,
+        it must not rely on anything but its arguments.
+        """
+
+        return {}
+
     def place_event(self):
         """
         place_event() is called once the node object has been fully initialized and placed in the flow.
@@ -340,6 +454,8 @@ class Node(Base):
         else:
             self.inputs.append(inp)
 
+        self.flow.flow_changed([self])
+
     def create_input_dt(self, dtype: DType, label: str = '', add_data={}, insert: int = None):
         """Creates and adds a new data input with a DType"""
         # InfoMsgs.write('create_input called')
@@ -357,6 +473,8 @@ class Node(Base):
         else:
             self.inputs.append(inp)
 
+        self.flow.flow_changed([self])
+
     def rename_input(self, index: int, label: str):
         self.inputs[index].label_str = label
 
@@ -370,14 +488,16 @@ class Node(Base):
             self.flow.connect_nodes(c.out, inp)
 
         self.inputs.remove(inp)
+        self.flow.flow_changed([self])
 
-    def create_output(self, label: str = '', type_: str = 'data', insert: int = None):
-        """Creates and adds a new output"""
+    def create_output(self, label: str = '', type_: str = 'data', insert: int = None, change_policy=None):
+        """Creates and adds a new output; see NodeOutput.val_changed() for the change policy"""
 
         out = NodeOutput(
               node=self,
               type_=type_,
-              label_str=label
+              label_str=label,
+              change_policy=change_policy,
         )
 
         if insert is not None:
@@ -385,6 +505,8 @@ class Node(Base):
         else:
             self.outputs.append(out)
 
+        self.flow.flow_changed([self])
+
     def rename_output(self, index: int, label: str):
         self.outputs[index].label_str = label
 
@@ -398,6 +520,7 @@ class Node(Base):
             self.flow.connect_nodes(out, c.inp)
 
         self.outputs.remove(out)
+        self.flow.flow_changed([self])
 
     #   VARIABLES
 
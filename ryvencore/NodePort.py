@@ -1,3 +1,5 @@
+import sys
+
 from .Base import Base
 
 from .RC import PortObjPos, FlowAlg
@@ -9,6 +11,8 @@ from .InfoMsgs import InfoMsgs
 class NodePort(Base):
     """Base class for inputs and outputs of nodes"""
 
+    __slots__ = ('val', 'node', 'io_pos', 'type_', 'label_str', 'connections')
+
     def __init__(self, node, io_pos, type_, label_str):
         Base.__init__(self)
 
@@ -29,7 +33,9 @@ class NodePort(Base):
         pass
 
     def flow_alg_data_mode(self):
-        return self.node.flow.alg_mode in (FlowAlg.DATA, FlowAlg.DATA_OPT)
+        return self.node.flow.alg_mode in (FlowAlg.DATA, FlowAlg.DATA_OPT, FlowAlg.DATA_COMPILED,
+                                           FlowAlg.DATA_PARALLEL, FlowAlg.DATA_MULTIPROCESS, FlowAlg.DATA_ASYNC,
+                                           FlowAlg.DATA_ITERATIVE)
 
     def data(self) -> dict:
         return {
@@ -41,6 +47,8 @@ class NodePort(Base):
 
 class NodeInput(NodePort):
 
+    __slots__ = ('add_data', 'dtype')
+
     def __init__(self, node, type_, label_str='', add_data=None, dtype: DType = None):
         super().__init__(node, PortObjPos.INPUT, type_, label_str)
 
@@ -55,15 +63,16 @@ class NodeInput(NodePort):
         if self.type_ == 'data':
             self.val = self.connections[0].get_val()
             if self.flow_alg_data_mode():
-                self.node.update(self.node.inputs.index(self))
+                self.node.flow.schedule_update(self.node, self.node.inputs.index(self))
 
     def disconnected(self):
         super().disconnected()
         if self.type_ == 'data' and self.flow_alg_data_mode():
-            self.node.update(self.node.inputs.index(self))
+            self.node.flow.schedule_update(self.node, self.node.inputs.index(self))
 
     def get_val(self):
-        InfoMsgs.write('getting value of node input')
+        if InfoMsgs.enabled:
+            InfoMsgs.write('getting value of node input')
 
         if self.flow_alg_data_mode() or len(self.connections) == 0:
             return self.val
@@ -74,7 +83,8 @@ class NodeInput(NodePort):
         """called from another node or from connected()"""
         if self.type_ == 'data':
             self.val = data  # self.get_val()
-            InfoMsgs.write('Data in input set to', data)
+            if InfoMsgs.enabled:
+                InfoMsgs.write('Data in input set to', data)
 
         self.node.update(inp=self.node.inputs.index(self))
 
@@ -92,31 +102,105 @@ class NodeInput(NodePort):
 
 
 
+def _numpy_aware_equal(a, b) -> bool:
+    # numpy is optional, if it hasn't been imported, there can't be any arrays
+    np = sys.modules.get('numpy')
+    if np is not None and (isinstance(a, np.ndarray) or isinstance(b, np.ndarray)):
+        return isinstance(a, np.ndarray) and isinstance(b, np.ndarray) and \
+               a.shape == b.shape and a.dtype == b.dtype and bool(np.array_equal(a, b))
+
+    try:
+        return bool(a == b)
+    except Exception:
+        return False
+
+
 class NodeOutput(NodePort):
-    def __init__(self, node, type_, label_str=''):
+
+    __slots__ = ('change_policy', '_hashed')
+
+    def __init__(self, node, type_, label_str='', change_policy=None):
         super().__init__(node, PortObjPos.OUTPUT, type_, label_str)
 
+        # see val_changed()
+        self.change_policy = change_policy
+        self._hashed = None     # (value, hash) of the last value hashed by a custom hash policy
+
+    def val_changed(self, val) -> bool:
+        """
+        Checks whether setting val would change the output's current value according to its change policy.
+        Unchanged values are not propagated, so the successors are not updated. The policies are
+            None:           everything is a change (default)
+            'identity':     val is not the current value
+            'equality':     val != the current value
+            'numpy':        like 'equality', but comparing NumPy arrays by shape, dtype and content
+            a callable:     a custom hash function, f(val) != f(current value)
+        """
+
+        policy = self.change_policy
+        if policy is None:
+            return True
+
+        old = self.val
+
+        if policy == 'identity':
+            return val is not old
+
+        if policy == 'equality':
+            if val is old:
+                return False
+            try:
+                return not bool(val == old)
+            except Exception:   # e.g. element-wise comparisons
+                return True
+
+        if policy == 'numpy':
+            return val is not old and not _numpy_aware_equal(val, old)
+
+        # custom hash
+        if self._hashed is not None and self._hashed[0] is old:
+            old_hash = self._hashed[1]
+        else:
+            old_hash = policy(old)
+        new_hash = policy(val)
+        self._hashed = (val, new_hash)
+
+        return new_hash != old_hash
+
     def exec(self):
         for c in self.connections:
             c.activate()
 
     def get_val(self):
-        InfoMsgs.write('getting value in node output')
+        if InfoMsgs.enabled:
+            InfoMsgs.write('getting value in node output')
 
         if self.node.flow.alg_mode == FlowAlg.EXEC:
-            self.node.update()
+            # updates the node if it hasn't been evaluated yet in the current exec activation
+            return self.node.flow.executors[FlowAlg.EXEC].pull_output(self)
 
         return self.val
 
     def set_val(self, val):
-        InfoMsgs.write('setting value in node output')
+        if InfoMsgs.enabled:
+            InfoMsgs.write('setting value in node output')
 
+        changed = self.val_changed(val)
         self.val = val
 
-        if self.flow_alg_data_mode():
+        if changed and self.flow_alg_data_mode():
             for c in self.connections:
                 c.activate(data=val)
 
+    def data(self) -> dict:
+        data = super().data()
+
+        # custom hash functions can't be saved
+        if isinstance(self.change_policy, str):
+            data['change policy'] = self.change_policy
+
+        return data
+
     # def connected(self):
     #     super().connected()
     #     if self.type_ == 'data' and self.node.flow.alg_mode == FlowAlg.DATA:
@@ -23,5 +23,8 @@ class NodeInputBP(NodePortBP):
 
 
 class NodeOutputBP(NodePortBP):
-    def __init__(self, label: str = '', type_: str = 'data'):
+    def __init__(self, label: str = '', type_: str = 'data', change_policy=None):
+        """change_policy: see NodeOutput.val_changed()"""
         super().__init__(label, type_)
+
+        self.change_policy = change_policy
@@ -0,0 +1,233 @@
+from collections import deque
+
+from .Tracer import Tracer
+
+
+class NodeStats:
+    """The statistics of one node in a profile, times are in seconds"""
+
+    __slots__ = ('calls', 'total', 'self_time', 'exceptions', 'activations')
+
+    def __init__(self):
+        self.calls = 0          # update_event() calls
+        self.total = 0.0        # wall time spent in update_event(), including nested updates
+        self.self_time = 0.0    # total without the updates of other nodes nested into this node's ones (data mode)
+        self.exceptions = 0     # update_event() calls which raised an exception
+        self.activations = 0    # activations of connections to the node's inputs
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls > 0 else 0.0
+
+    def add(self, stats):
+        self.calls += stats.calls
+        self.total += stats.total
+        self.self_time += stats.self_time
+        self.exceptions += stats.exceptions
+        self.activations += stats.activations
+
+    def data(self) -> dict:
+        return {
+            'calls': self.calls,
+            'total': self.total,
+            'mean': self.mean,
+            'self': self.self_time,
+            'exceptions': self.exceptions,
+            'activations': self.activations,
+        }
+
+
+class Profiler:
+    """
+    Collects statistics of the node updates of a flow from the spans of the Tracer, see Flow.profile().
+    For every node it counts update_event() calls, exceptions and activations of connections to its inputs,
+    and sums up the wall time spent in update_event(). It also remembers the time every node took in the last
+    finished execution, which gives the critical path, the chain of nodes which took the longest.
+    """
+
+    def __init__(self, flow):
+        self.flow = flow
+        self.stats = {}             # node -> NodeStats
+        self.last_execution = {}    # node -> self time (ns) in the last finished execution
+        self.current_execution = {}
+        self.nested = {}            # thread id -> [(start, end), ...] of node spans which might be nested into others
+        self.nodes = {}             # global id -> node, see node()
+        self.connections = {}       # global id -> connection
+
+    def start(self):
+        Tracer.add_listener(self.record)
+
+    def stop(self):
+        Tracer.remove_listener(self.record)
+
+        if len(self.current_execution) > 0:     # e.g. an execution which hasn't finished
+            self.last_execution = self.current_execution
+            self.current_execution = {}
+
+    def record(self, span):
+        """called by the Tracer for every span"""
+
+        name, category, start, duration, tid, args = span
+
+        if category == 'node':
+            node = self.node(args['node'])
+            if node is None:
+                return
+
+            # the spans of the updates nested into this one (data mode) have been recorded already
+            nested = self.nested.setdefault(tid, [])
+            nested_duration = 0
+            while len(nested) > 0 and nested[-1][0] >= start:
+                s, e = nested.pop()
+                nested_duration += e - s
+            nested.append((start, start + duration))
+            self_duration = duration - nested_duration
+
+            stats = self.stats.get(node)
+            if stats is None:
+                stats = self.stats[node] = NodeStats()
+            stats.calls += 1
+            stats.total += duration / 1e9
+            stats.self_time += self_duration / 1e9
+            if 'exception' in args:
+                stats.exceptions += 1
+
+            self.current_execution[node] = self.current_execution.get(node, 0) + self_duration
+
+        elif category == 'connection':
+            c = self.connection(args['connection'])
+            if c is None:
+                return
+
+            node = c.inp.node
+            stats = self.stats.get(node)
+            if stats is None:
+                stats = self.stats[node] = NodeStats()
+            stats.activations += 1
+
+        elif name == 'execution' and args.get('flow') == self.flow.GLOBAL_ID:
+            self.last_execution = self.current_execution
+            self.current_execution = {}
+            self.nested.clear()
+
+    def node(self, global_id):
+        """returns the flow's node with the global id, or None"""
+
+        if global_id not in self.nodes:
+            self.nodes = {n.GLOBAL_ID: n for n in self.flow.nodes}
+            self.nodes.setdefault(global_id, None)   # a node of another flow
+        return self.nodes[global_id]
+
+    def connection(self, global_id):
+        """returns the flow's connection with the global id, or None"""
+
+        if global_id not in self.connections:
+            self.connections = {c.GLOBAL_ID: c for c in self.flow.connections}
+            self.connections.setdefault(global_id, None)
+        return self.connections[global_id]
+
+    # RESULTS
+
+    def node_stats(self, sort: str = 'total') -> list:
+        """Returns a list of dicts with the statistics of every updated node, sorted descending by the key sort,
+        which can be 'calls', 'total', 'mean', 'self', 'exceptions' or 'activations'"""
+
+        rows = []
+        for node, stats in self.stats.items():
+            row = {'node': node, 'title': node.title, 'class': type(node).__name__}
+            row.update(stats.data())
+            rows.append(row)
+
+        rows.sort(key=lambda r: r[sort], reverse=True)
+        return rows
+
+    def class_stats(self, sort: str = 'total') -> list:
+        """Like node_stats(), but summing up the statistics of all nodes of the same class"""
+
+        classes = {}
+        for node, stats in self.stats.items():
+            cls_stats = classes.get(type(node))
+            if cls_stats is None:
+                cls_stats = classes[type(node)] = NodeStats()
+            cls_stats.add(stats)
+
+        rows = []
+        for cls, stats in classes.items():
+            row = {'class': cls.__name__, 'identifier': cls.identifier}
+            row.update(stats.data())
+            rows.append(row)
+
+        rows.sort(key=lambda r: r[sort], reverse=True)
+        return rows
+
+    def critical_path(self) -> tuple:
+        """
+        Returns the critical path through the last finished execution as ([node, ...], seconds), the path along
+        the flow's (non-feedback) connections with the largest sum of the nodes' self times in the execution.
+        """
+
+        times = self.last_execution
+        if len(times) == 0:
+            return [], 0.0
+
+        successors = self.flow.node_successors
+
+        # topological order of the executed nodes, nodes in cycles are left out
+        in_degree = dict.fromkeys(times, 0)
+        for n in times:
+            for s in successors.get(n, ()):
+                if s in in_degree:
+                    in_degree[s] += 1
+
+        ready = deque(n for n, d in in_degree.items() if d == 0)
+        longest = {n: times[n] for n in ready}    # node -> longest path ending at node (ns)
+        predecessor = {}
+        end = None
+
+        while len(ready) > 0:
+            n = ready.popleft()
+            if end is None or longest[n] > longest[end]:
+                end = n
+
+            for s in successors.get(n, ()):
+                if s not in in_degree:
+                    continue
+
+                length = longest[n] + times[s]
+                if length > longest.get(s, -1):
+                    longest[s] = length
+                    predecessor[s] = n
+
+                in_degree[s] -= 1
+                if in_degree[s] == 0:
+                    ready.append(s)
+
+        if end is None:     # all executed nodes are in cycles
+            return [], 0.0
+
+        path = [end]
+        while path[-1] in predecessor:
+            path.append(predecessor[path[-1]])
+        path.reverse()
+
+        return path, longest[end] / 1e9
+
+    def table(self, sort: str = 'total', by_class: bool = False, limit: int = None) -> str:
+        """Returns the statistics as text table, see node_stats() and class_stats()"""
+
+        rows = self.class_stats(sort) if by_class else self.node_stats(sort)
+        if limit is not None:
+            rows = rows[:limit]
+
+        lines = [
+            f'{"class" if by_class else "node":<32} {"calls":>8} {"total [ms]":>12} {"mean [ms]":>12} '
+            f'{"self [ms]":>12} {"exceptions":>10} {"activations":>11}'
+        ]
+        for r in rows:
+            name = r['class'] if by_class else f'{r["title"]} ({r["node"].GLOBAL_ID})'
+            lines.append(
+                f'{name[:32]:<32} {r["calls"]:>8} {r["total"] * 1e3:>12.3f} {r["mean"] * 1e3:>12.3f} '
+                f'{r["self"] * 1e3:>12.3f} {r["exceptions"]:>10} {r["activations"]:>11}'
+            )
+
+        return '\n'.join(lines)
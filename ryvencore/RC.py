@@ -9,6 +9,11 @@ class FlowAlg(IntEnum):
     DATA = 1
     EXEC = 2
     DATA_OPT = 3
+    DATA_COMPILED = 4
+    DATA_PARALLEL = 5
+    DATA_MULTIPROCESS = 6
+    DATA_ASYNC = 7
+    DATA_ITERATIVE = 8
 
     @staticmethod
     def str(mode):
@@ -20,6 +25,16 @@ class FlowAlg(IntEnum):
             return 'exec'
         elif mode == FlowAlg.DATA_OPT:
             return 'data opt'
+        elif mode == FlowAlg.DATA_COMPILED:
+            return 'data compiled'
+        elif mode == FlowAlg.DATA_PARALLEL:
+            return 'data parallel'
+        elif mode == FlowAlg.DATA_MULTIPROCESS:
+            return 'data multiprocess'
+        elif mode == FlowAlg.DATA_ASYNC:
+            return 'data async'
+        elif mode == FlowAlg.DATA_ITERATIVE:
+            return 'data iterative'
 
         return None
 
@@ -31,6 +46,16 @@ class FlowAlg(IntEnum):
             return FlowAlg.EXEC
         elif mode == 'data opt':
             return FlowAlg.DATA_OPT
+        elif mode == 'data compiled':
+            return FlowAlg.DATA_COMPILED
+        elif mode == 'data parallel':
+            return FlowAlg.DATA_PARALLEL
+        elif mode == 'data multiprocess':
+            return FlowAlg.DATA_MULTIPROCESS
+        elif mode == 'data async':
+            return FlowAlg.DATA_ASYNC
+        elif mode == 'data iterative':
+            return FlowAlg.DATA_ITERATIVE
 
         return None
 
@@ -2,6 +2,8 @@ from .Base import Base
 from .logging import LogsManager
 from .script_variables import VarsManager
 from .Flow import Flow
+from .project_format import ScriptChunk
+from .utils import reserialize
 
 
 class Script(Base):
@@ -52,3 +54,46 @@ class Script(Base):
             'flow': self.flow.data(),
             'GID': self.GLOBAL_ID,
         }
+
+
+class ScriptPlaceholder:
+    """
+    Stands in for a script of a lazily loaded project in Session.scripts, see Session.load(), until the script
+    gets loaded by Session.load_script(), which happens on the first access of any other attribute
+    (like flow) through the placeholder, so it can be used like the script.
+    """
+
+    def __init__(self, session, data):
+        self.session = session
+        self.script = None  # the loaded script
+        self._data = data   # the script's data dict, or a project_format.ScriptChunk
+
+        if isinstance(data, ScriptChunk):
+            self.title = data.title
+        else:
+            self.title = data['title'] if 'title' in data else data['name']
+
+    def load_data(self) -> dict:
+        """Returns the script's data dict"""
+
+        return self._data.load() if isinstance(self._data, ScriptChunk) else self._data
+
+    def load(self) -> Script:
+        if self.script is None:
+            self.session.load_script(self)
+        return self.script
+
+    def data(self) -> dict:
+        """Returns the script's data without loading it"""
+
+        if self.script is not None:
+            return self.script.data()
+
+        data = reserialize(self.load_data())
+        data['title'] = self.title
+        return data
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
@@ -1,8 +1,11 @@
 from .Base import Base, Event
 
 
-from .Script import Script
+from .Script import Script, ScriptPlaceholder
 from .InfoMsgs import InfoMsgs
+from .MemoCache import MemoCache
+from .utils import blob_table, gc_paused
+from . import project_format
 
 from typing import List, Dict
 
@@ -16,6 +19,8 @@ class Session(Base):
     def __init__(
             self,
             gui: bool = False,
+            memo_cache_size: int = 1024,
+            memo_eviction: str = 'lru',
     ):
         Base.__init__(self)
 
@@ -25,12 +30,15 @@ class Session(Base):
         self.script_deleted = Event(Script)
 
         # ATTRIBUTES
-        self.scripts: [Script] = []
+        self.scripts: [Script] = []   # and ScriptPlaceholders of lazily loaded scripts, see load()
         self.nodes = []  # list of node CLASSES
         self.invisible_nodes = []
-        self.gui: bool = gui
+        self.gui: bool = gui            # whether a frontend is running the session, ryvencore itself doesn't depend on it
         self.init_data = None
 
+        # output values of pure nodes, see Node.pure
+        self.memo_cache = MemoCache(memo_cache_size, memo_eviction)
+
 
     def register_nodes(self, node_classes: List):
         """Registers a list of Nodes which then become available in the flows"""
@@ -60,6 +68,8 @@ class Session(Base):
 
         nodes = []
         for s in self.scripts:
+            if isinstance(s, ScriptPlaceholder):
+                continue
             for n in s.flow.nodes:
                 nodes.append(n)
         return nodes
@@ -113,6 +123,8 @@ class Session(Base):
         """Removes an existing script."""
 
         self.scripts.remove(script)
+        if not isinstance(script, ScriptPlaceholder):  # lazily loaded scripts which haven't been loaded have no flow
+            script.flow.shutdown()
 
         self.script_deleted.emit(script)
 
@@ -123,23 +135,74 @@ class Session(Base):
         return InfoMsgs
 
 
-    def load(self, project: Dict) -> List[Script]:
-        """Loads a project and raises an exception if required nodes are missing"""
+    def load(self, project, lazy: bool = False) -> List[Script]:
+        """
+        Loads a project, a dict or a binary project (see serialize()), and raises an exception
+        if required nodes are missing.
+        If lazy is set, the scripts are added as ScriptPlaceholders, and every script is only loaded
+        when it's accessed, see load_script().
+        """
 
         # TODO: perform validity checks
 
+        if project_format.is_binary(project):
+            project = project_format.loads(project, lazy=lazy)
+
         self.init_data = project
 
         new_scripts = []
-        for sc in project['scripts']:
-            new_scripts.append(self.create_script(data=sc))
+        with gc_paused():
+            for sc in project['scripts']:
+                if lazy:
+                    placeholder = ScriptPlaceholder(self, sc)
+                    self.scripts.append(placeholder)
+                    new_scripts.append(placeholder)
+                else:
+                    new_scripts.append(self.create_script(data=sc))
 
         return new_scripts
 
-    def serialize(self):
-        """Returns the project as JSON compatible dict to be saved and loaded again using load()"""
+    def load_script(self, placeholder: ScriptPlaceholder) -> Script:
+        """Loads a script of a lazily loaded project, replacing its placeholder in scripts"""
+
+        if placeholder.script is not None:
+            return placeholder.script
+
+        index = self.scripts.index(placeholder)
+        script = Script(session=self, title=placeholder.title, load_data=placeholder.load_data())
+        placeholder.script = script
+        self.scripts[index] = script
+
+        with gc_paused():
+            script.load_flow()
+
+        self.new_script_created.emit(script)
+
+        return script
+
+    def serialize(self, binary: bool = False):
+        """Returns the project as JSON compatible dict to be saved and loaded again using load(),
+        or, if binary is set, as bytes in the more compact and faster binary format, see project_format"""
+
+        if not binary:
+            return self.complete_data(self.data())
+
+        with blob_table() as table:
+            project = self.complete_data(self.data())
+        return project_format.dumps(project, table)
+
+    def save_file(self, path: str, buffer_threshold: int = 1 << 16):
+        """Saves the project in the binary format to the file path, with the out-of-band buffers of at least
+        buffer_threshold bytes (e.g. the data of large NumPy arrays) in a sidecar file, see project_format"""
+
+        with blob_table(buffer_threshold) as table:
+            project = self.complete_data(self.data())
+        project_format.save(project, table, path)
+
+    def load_file(self, path: str, lazy: bool = False) -> List[Script]:
+        """Loads a project saved with save_file(), memory-mapping the files, see load()"""
 
-        return self.complete_data(self.data())
+        return self.load(project_format.load(path, lazy), lazy)
 
 
     def data(self) -> dict:
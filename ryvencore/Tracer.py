@@ -0,0 +1,103 @@
+import json
+import os
+import threading
+from collections import deque
+from time import perf_counter_ns
+
+
+class Tracer:
+    """
+    A few static methods for tracing flow execution. While enabled, spans of node updates (update_event()),
+    connection activations and executor phases (execution, analysis, propagation) are recorded into a bounded
+    in-memory ring buffer, which only keeps the most recent ones. They can be exported as Chrome Trace Event JSON,
+    which can be opened in https://ui.perfetto.dev or chrome://tracing.
+    Spans can also be passed on to listeners, like the Profiler.
+    Tracing is disabled by default. As long as nothing is recorded and there are no listeners,
+    the instrumented code only checks Tracer.enabled.
+    """
+
+    enabled = False     # whether spans are recorded or there are listeners
+    recording = False   # whether spans are recorded in the ring buffer
+    listeners = []
+    _events = deque(maxlen=100000)   # (name, category, start ns, duration ns, thread id, args)
+
+    @staticmethod
+    def enable(capacity: int = None):
+        """Enables recording spans; capacity is the max number of spans kept"""
+
+        if capacity is not None and capacity != Tracer._events.maxlen:
+            Tracer._events = deque(Tracer._events, maxlen=capacity)
+        Tracer.recording = True
+        Tracer.enabled = True
+
+    @staticmethod
+    def disable():
+        Tracer.recording = False
+        Tracer.enabled = len(Tracer.listeners) > 0
+
+    @staticmethod
+    def add_listener(listener):
+        """Adds a callable which receives every span as (name, category, start ns, duration ns, thread id, args)"""
+
+        Tracer.listeners = Tracer.listeners + [listener]
+        Tracer.enabled = True
+
+    @staticmethod
+    def remove_listener(listener):
+        Tracer.listeners = [l for l in Tracer.listeners if l != listener]
+        Tracer.enabled = Tracer.recording or len(Tracer.listeners) > 0
+
+    @staticmethod
+    def clear():
+        Tracer._events.clear()
+
+    # the clock of all spans
+    now = staticmethod(perf_counter_ns)
+
+    @staticmethod
+    def span(name: str, category: str, start: int, args: dict = None):
+        """Records a span from start (a Tracer.now() timestamp) until now"""
+
+        span = (name, category, start, perf_counter_ns() - start, threading.get_ident(), args)
+
+        if Tracer.recording:
+            Tracer._events.append(span)
+        for listener in Tracer.listeners:
+            listener(span)
+
+    @staticmethod
+    def events() -> list:
+        """Returns the recorded spans as Chrome Trace Event dicts ('complete' events, times in microseconds)"""
+
+        pid = os.getpid()
+        events = []
+        for name, category, start, duration, tid, args in list(Tracer._events):
+            e = {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': start / 1000,
+                'dur': duration / 1000,
+                'pid': pid,
+                'tid': tid,
+            }
+            if args is not None:
+                e['args'] = args
+            events.append(e)
+
+        return events
+
+    @staticmethod
+    def export(path: str = None) -> dict:
+        """Returns the recorded spans as Chrome Trace Event JSON object and writes it to path if given"""
+
+        trace = {
+            'traceEvents': Tracer.events(),
+            'displayTimeUnit': 'ns',
+        }
+
+        if path is not None:
+            with open(path, 'w') as f:
+                json.dump(trace, f)
+
+        return trace
@@ -1,10 +1,11 @@
 from .InfoMsgs import InfoMsgs
+from .Tracer import Tracer
 from .RC import *
 from .Session import Session
-from .Script import Script
+from .Script import Script, ScriptPlaceholder
 from .Flow import Flow
 from .logging import *
 from .Node import Node
 from .NodePortBP import NodeInputBP, NodeOutputBP
-from .Connection import DataConnection, ExecConnection
+from .Connection import DataConnection, ExecConnection, FeedbackConnection
 from .utils import serialize, deserialize
@@ -0,0 +1 @@
+"""Benchmarks for ryvencore, every module can be run as a script, e.g. python -m ryvencore.benchmarks.memory"""
@@ -0,0 +1,193 @@
+"""
+Measures the execution speed of flows with the synthetic topologies of graphs.py in different algorithm modes,
+and writes the results to a JSON file, so they can be compared between versions. Run it with
+
+    python -m ryvencore.benchmarks.execution [-o results.json] [-m 'data' 'data opt' 'exec'] [-t chain lattice]
+
+An execution updates the roots of a flow, except in exec mode, where data is only pulled, so it updates the
+sinks. For every topology, node class and mode, executions are repeated for at least --min-time seconds,
+giving the executions per second and the latency percentiles. The number of node updates per execution
+shows the asymptotic differences between the modes, e.g. in data mode, a node of the diamonds topology is
+updated once for every path leading to it. Executions exceeding --budget node updates are aborted, and an
+execution is only complete if all nodes have been updated, which isn't the case if it has been aborted or
+if it exceeded Python's recursion limit. The peak memory is measured in an additional complete execution.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from ryvencore import Session
+from ryvencore.benchmarks.graphs import TOPOLOGIES, NODE_CLASSES, TrivialNode
+
+
+MODES = ('data', 'data opt', 'exec')
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+def version() -> str:
+    try:
+        from importlib.metadata import version
+        return version('ryvencore')
+    except Exception:
+        return 'unknown'
+
+
+class Benchmark:
+    """a flow built from one topology with one node class in one algorithm mode"""
+
+    def __init__(self, session, topology: str, size: int, node_class, mode: str):
+        generator, _ = TOPOLOGIES[topology]
+
+        self.flow = session.create_script(f'{topology} {node_class.title} {mode}').flow
+        self.flow.set_algorithm_mode(mode)
+        self.roots, self.sinks = generator(self.flow, node_class, size)
+        self.mode = mode
+
+    def execute(self):
+        for n in (self.sinks if self.mode == 'exec' else self.roots):
+            n.update()
+
+    def run(self, min_time: float, max_executions: int, budget: int) -> dict:
+        latencies = []
+        updates = 0
+        complete = True
+        peak = None
+
+        TrivialNode.budget = budget
+        try:
+            start = time.perf_counter()
+            while len(latencies) < max_executions and (len(latencies) == 0 or time.perf_counter() - start < min_time):
+                for n in self.flow.nodes:
+                    n.updated = False
+                TrivialNode.updates = 0
+
+                t = time.perf_counter()
+                self.execute()
+                latencies.append(time.perf_counter() - t)
+
+                updates = TrivialNode.updates
+                if not all(n.updated for n in self.flow.nodes):
+                    # aborted or failed, repeating it would only take longer
+                    complete = False
+                    break
+
+            if complete:
+                gc.collect()
+                tracemalloc.start()
+                try:
+                    before = tracemalloc.get_traced_memory()[0]
+                    self.execute()
+                    peak = tracemalloc.get_traced_memory()[1] - before
+                finally:
+                    tracemalloc.stop()
+        finally:
+            TrivialNode.budget = float('inf')
+
+        latencies.sort()
+        total = sum(latencies)
+
+        return {
+            'nodes': len(self.flow.nodes),
+            'connections': len(self.flow.connections),
+            'executions': len(latencies),
+            'complete': complete,
+            'aborted': updates > budget,
+            'executions per second': len(latencies) / total if total > 0 else None,
+            'latency [ms]': {
+                'mean': total / len(latencies) * 1e3,
+                'p50': percentile(latencies, 50) * 1e3,
+                'p90': percentile(latencies, 90) * 1e3,
+                'p99': percentile(latencies, 99) * 1e3,
+                'max': latencies[-1] * 1e3,
+            },
+            'updates per execution': updates,
+            'peak memory [bytes]': peak,
+        }
+
+
+def run(topologies=None, node_classes=None, modes=MODES, sizes: dict = None,
+        min_time: float = 1.0, max_executions: int = 1000, budget: int = 10**5, log=None) -> dict:
+    """
+    Runs the benchmarks and returns the results. topologies and node_classes are lists of the names in
+    graphs.TOPOLOGIES and graphs.NODE_CLASSES (all by default), sizes can override the topologies' default sizes.
+    """
+
+    topologies = topologies or list(TOPOLOGIES)
+    node_classes = node_classes or list(NODE_CLASSES)
+    sizes = sizes or {}
+
+    session = Session()
+    session.register_nodes(list(NODE_CLASSES.values()))
+
+    results = []
+    for topology in topologies:
+        size = sizes.get(topology, TOPOLOGIES[topology][1])
+        for class_name in node_classes:
+            for mode in modes:
+                benchmark = Benchmark(session, topology, size, NODE_CLASSES[class_name], mode)
+                result = {
+                    'topology': topology,
+                    'size': size,
+                    'node class': class_name,
+                    'mode': mode,
+                }
+                result.update(benchmark.run(min_time, max_executions, budget))
+                results.append(result)
+
+                session.delete_script(session.scripts[-1])
+
+                if log is not None:
+                    log(result)
+
+    return {
+        'ryvencore': version(),
+        'python': sys.version,
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+
+
+def print_result(r: dict):
+    eps = r['executions per second']
+    print(f'{r["topology"]:>12} {r["size"]:>5} {r["node class"]:>8} {r["mode"]:>9}: '
+          f'{eps:>10.1f} exec/s, p50 {r["latency [ms]"]["p50"]:>10.3f} ms, '
+          f'{r["updates per execution"]:>8} updates'
+          f'{" (aborted)" if r["aborted"] else "" if r["complete"] else " (incomplete)"}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='ryvencore execution benchmarks')
+    parser.add_argument('-o', '--output', default='execution_benchmark.json', help='JSON results file')
+    parser.add_argument('-t', '--topologies', nargs='*', choices=list(TOPOLOGIES))
+    parser.add_argument('-c', '--node-classes', nargs='*', choices=list(NODE_CLASSES))
+    parser.add_argument('-m', '--modes', nargs='*', default=list(MODES))
+    parser.add_argument('-s', '--size', type=int, help='size of all topologies instead of the default ones')
+    parser.add_argument('--min-time', type=float, default=1.0, help='min seconds per benchmark')
+    parser.add_argument('--max-executions', type=int, default=1000)
+    parser.add_argument('--budget', type=int, default=10**5, help='max node updates per execution')
+    args = parser.parse_args()
+
+    topologies = args.topologies or list(TOPOLOGIES)
+    results = run(
+        topologies=topologies,
+        node_classes=args.node_classes,
+        modes=args.modes,
+        sizes={t: args.size for t in topologies} if args.size is not None else None,
+        min_time=args.min_time,
+        max_executions=args.max_executions,
+        budget=args.budget,
+        log=print_result,
+    )
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'results written to {args.output}')
@@ -0,0 +1,183 @@
+"""
+Generators of flows with synthetic graph topologies for the benchmarks. Every generator adds the nodes
+and connections to a flow in one batch edit and returns the lists of root nodes (without predecessors)
+and sink nodes (without successors). The nodes have one data output, inputs are added as they get connected.
+"""
+
+import random
+
+from ryvencore import Node, NodeOutputBP
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class TrivialNode(Node):
+    """sets the sum of its inputs, which costs almost nothing compared to the executors' overhead"""
+
+    title = 'trivial'
+    init_outputs = [NodeOutputBP()]
+
+    # the number of updates of all benchmark nodes, and the number after which they fail without setting
+    # their output, which quickly ends executions that would take too long, like data mode ones on lattices
+    updates = 0
+    budget = float('inf')
+
+    def __init__(self, params):
+        super().__init__(params)
+
+        self.updated = False    # reset by the benchmarks before every execution
+
+    def update_event(self, inp=-1):
+        TrivialNode.updates += 1
+        if TrivialNode.updates > TrivialNode.budget:
+            raise BudgetExceeded()
+        self.updated = True
+
+        s = 1
+        for i in range(len(self.inputs)):
+            s += self.input(i) or 0
+        self.set_output_val(0, s % 1000003)
+
+
+class HeavyNode(TrivialNode):
+    """like TrivialNode, but doing some pure Python work on every update, which dominates the executors' overhead"""
+
+    title = 'heavy'
+    work = 20000
+
+    def update_event(self, inp=-1):
+        x = 0
+        for i in range(self.work):
+            x ^= i
+        super().update_event(inp)
+
+
+NODE_CLASSES = {
+    'trivial': TrivialNode,
+    'heavy': HeavyNode,
+}
+
+
+def connect(flow, n1, n2):
+    """connects the output of n1 to a new input of n2"""
+
+    n2.create_input()
+    flow.connect_nodes(n1.outputs[0], n2.inputs[-1])
+
+
+def chain(flow, node_class, size: int):
+    """a chain of size nodes"""
+
+    with flow.batch_edit():
+        nodes = [flow.create_node(node_class) for _ in range(size)]
+        for n1, n2 in zip(nodes, nodes[1:]):
+            connect(flow, n1, n2)
+
+    return nodes[:1], nodes[-1:]
+
+
+def diamonds(flow, node_class, size: int):
+    """a chain of size diamonds, where every node feeds two nodes which both feed the next one,
+    so a node is reached along 2^size paths"""
+
+    with flow.batch_edit():
+        first = last = flow.create_node(node_class)
+        for _ in range(size):
+            left, right, join = [flow.create_node(node_class) for _ in range(3)]
+            connect(flow, last, left)
+            connect(flow, last, right)
+            connect(flow, left, join)
+            connect(flow, right, join)
+            last = join
+
+    return [first], [last]
+
+
+def binary_tree(flow, node_class, size: int):
+    """a binary tree of depth size, with the data flowing from the root to the 2^size leaves"""
+
+    with flow.batch_edit():
+        root = flow.create_node(node_class)
+        level = [root]
+        for _ in range(size):
+            next_level = []
+            for n in level:
+                for _ in range(2):
+                    child = flow.create_node(node_class)
+                    connect(flow, n, child)
+                    next_level.append(child)
+            level = next_level
+
+    return [root], level
+
+
+def fan_out(flow, node_class, size: int):
+    """one node feeding size nodes"""
+
+    with flow.batch_edit():
+        root = flow.create_node(node_class)
+        sinks = [flow.create_node(node_class) for _ in range(size)]
+        for n in sinks:
+            connect(flow, root, n)
+
+    return [root], sinks
+
+
+def fan_in(flow, node_class, size: int):
+    """one node fed by size nodes, which are all fed by the same root"""
+
+    with flow.batch_edit():
+        root = flow.create_node(node_class)
+        sink = flow.create_node(node_class)
+        for _ in range(size):
+            n = flow.create_node(node_class)
+            connect(flow, root, n)
+            connect(flow, n, sink)
+
+    return [root], [sink]
+
+
+def lattice(flow, node_class, size: int):
+    """a size x size grid, where every node feeds its right and its lower neighbor"""
+
+    with flow.batch_edit():
+        grid = [[flow.create_node(node_class) for _ in range(size)] for _ in range(size)]
+        for i in range(size):
+            for j in range(size):
+                if j + 1 < size:
+                    connect(flow, grid[i][j], grid[i][j + 1])
+                if i + 1 < size:
+                    connect(flow, grid[i][j], grid[i + 1][j])
+
+    return [grid[0][0]], [grid[-1][-1]]
+
+
+def random_dag(flow, node_class, size: int, edges_per_node: int = 2, seed: int = 0):
+    """size nodes, each fed by up to edges_per_node random nodes created before it,
+    so the first node is the only root"""
+
+    rnd = random.Random(seed)
+
+    with flow.batch_edit():
+        nodes = [flow.create_node(node_class) for _ in range(size)]
+        has_successors = [False] * size
+        for i in range(1, size):
+            for j in set(rnd.randrange(i) for _ in range(edges_per_node)):
+                connect(flow, nodes[j], nodes[i])
+                has_successors[j] = True
+
+    return nodes[:1], [n for n, s in zip(nodes, has_successors) if not s]
+
+
+# name -> (generator, default size)
+TOPOLOGIES = {
+    'chain': (chain, 1000),
+    'diamonds': (diamonds, 12),
+    'binary tree': (binary_tree, 10),
+    'fan out': (fan_out, 1000),
+    'fan in': (fan_in, 1000),
+    'lattice': (lattice, 30),
+    'random dag': (random_dag, 1000),
+}
@@ -0,0 +1,78 @@
+"""
+Measures the memory used per node, port and connection of a flow, using tracemalloc. Run it with
+
+    python -m ryvencore.benchmarks.memory [number of nodes]
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from ryvencore import Session, Node, NodeInputBP, NodeOutputBP
+
+
+class EmptyNode(Node):
+    title = 'empty'
+
+
+class PortsNode(Node):
+    """a node with PORTS data inputs and PORTS data outputs"""
+
+    title = 'ports'
+    init_inputs = [NodeInputBP() for _ in range(4)]
+    init_outputs = [NodeOutputBP() for _ in range(4)]
+
+
+PORTS = 4
+
+
+def traced_bytes(build) -> int:
+    """returns the number of bytes allocated by build() which are still in use when it returned"""
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    del result
+    return after - before
+
+
+def measure(num_nodes: int = 10000) -> dict:
+    """Returns the bytes used per node (without ports), per port and per connection"""
+
+    session = Session()
+    session.register_nodes([EmptyNode, PortsNode])
+
+    def build(node_class, connect=False):
+        flow = session.create_script(f'memory {len(session.scripts)}').flow
+        with flow.batch_edit():
+            nodes = [flow.create_node(node_class) for _ in range(num_nodes)]
+            if connect:
+                for n1, n2 in zip(nodes, nodes[1:]):
+                    for i in range(PORTS):
+                        flow.connect_nodes(n1.outputs[i], n2.inputs[i])
+        return session.scripts.pop()
+
+    nodes_bytes = traced_bytes(lambda: build(EmptyNode))
+    ports_bytes = traced_bytes(lambda: build(PortsNode))
+    connections_bytes = traced_bytes(lambda: build(PortsNode, connect=True))
+
+    return {
+        'nodes': num_nodes,
+        'bytes per node': nodes_bytes / num_nodes,
+        'bytes per port': (ports_bytes - nodes_bytes) / (num_nodes * 2 * PORTS),
+        'bytes per connection': (connections_bytes - ports_bytes) / ((num_nodes - 1) * PORTS),
+    }
+
+
+if __name__ == '__main__':
+    num_nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    for key, value in measure(num_nodes).items():
+        print(f'{key:>22}: {value:.0f}')
@@ -0,0 +1,218 @@
+"""
+Measures saving and loading of large projects: Session.serialize(), json.dumps(), json.loads() and
+Session.load(), where the loading time is split into phases by temporarily wrapping the functions doing
+the work. Run it with
+
+    python -m ryvencore.benchmarks.serialization [-o results.json] [-n 1000 10000 100000] [-v 100] [-s 1000]
+
+The projects consist of one script with a chain of nodes, each having one connected and two unconnected
+inputs holding lists of --value-size floats, and --variables script variables holding such lists too.
+The phases are measured exclusively, i.e. the time of a phase nested into another one (like deserialization
+in Node.initialize()) only counts for the inner one; 'other' is the rest of Session.load().
+The binary project format (see project_format) is measured as well, its blob table stores the values,
+which are the same for all nodes, only once.
+"""
+
+import argparse
+import contextlib
+import gc
+import importlib
+import json
+import platform
+import sys
+import time
+
+from ryvencore import Session, Flow, Node, NodeInputBP, NodeOutputBP
+from ryvencore.benchmarks.execution import version
+
+# the modules, ryvencore.Flow and ryvencore.Node are the classes
+flow_module = importlib.import_module('ryvencore.Flow')
+node_module = importlib.import_module('ryvencore.Node')
+variable_module = importlib.import_module('ryvencore.script_variables.Variable')
+
+
+class LoadNode(Node):
+    """a node with one input to be connected, two inputs holding values, and some state"""
+
+    title = 'load'
+    init_inputs = [NodeInputBP(), NodeInputBP(), NodeInputBP()]
+    init_outputs = [NodeOutputBP()]
+
+    def __init__(self, params):
+        super().__init__(params)
+
+        self.config = {'factor': 1.0, 'name': 'load node'}
+
+    def update_event(self, inp=-1):
+        self.set_output_val(0, self.input(0))
+
+    def get_state(self) -> dict:
+        return self.config
+
+    def set_state(self, data: dict, version):
+        self.config = data
+
+
+def build_project(num_nodes: int, num_variables: int, value_size: int) -> Session:
+    """returns a session with one script holding the project"""
+
+    session = Session()
+    session.register_node(LoadNode)
+
+    script = session.create_script('project')
+    flow = script.flow
+    value = [float(i) for i in range(value_size)]
+
+    with flow.batch_edit():
+        nodes = [flow.create_node(LoadNode) for _ in range(num_nodes)]
+        for n in nodes:
+            n.inputs[1].val = list(value)
+            n.inputs[2].val = 'x' * value_size
+        for n1, n2 in zip(nodes, nodes[1:]):
+            flow.connect_nodes(n1.outputs[0], n2.inputs[0])
+
+    for i in range(num_variables):
+        script.vars_manager.create_new_var(f'var{i}')
+        script.vars_manager.set_var(f'var{i}', list(value))
+
+    return session
+
+
+# phase name -> [(object, attribute name), ...] of the functions doing the phase's work
+PHASES = {
+    'node class lookup': [(flow_module, 'node_from_identifier')],
+    'node initialize': [(Node, 'initialize')],
+    'setup ports': [(Node, 'setup_ports')],
+    'deserialization': [(node_module, 'deserialize'), (variable_module, 'deserialize')],
+    'connection building': [(Flow, 'connect_nodes_from_data')],
+    'batch execution': [(Flow, '_commit_batch')],
+}
+
+
+@contextlib.contextmanager
+def phase_timers(times: dict):
+    """Wraps the functions of PHASES while active, summing up their exclusive times in seconds into times"""
+
+    stack = []      # [phase, start of the phase's current slice], the innermost phase last
+    originals = []
+
+    def wrap(phase, f):
+        def wrapper(*args, **kwargs):
+            now = time.perf_counter()
+            if len(stack) > 0:      # pause the outer phase
+                outer = stack[-1]
+                times[outer[0]] += now - outer[1]
+            stack.append([phase, now])
+            try:
+                return f(*args, **kwargs)
+            finally:
+                now = time.perf_counter()
+                times[phase] += now - stack.pop()[1]
+                if len(stack) > 0:  # resume the outer phase
+                    stack[-1][1] = now
+        return wrapper
+
+    for phase, targets in PHASES.items():
+        times.setdefault(phase, 0.0)
+        for obj, name in targets:
+            f = getattr(obj, name)
+            originals.append((obj, name, obj.__dict__[name]))
+            setattr(obj, name, wrap(phase, f))
+
+    try:
+        yield times
+    finally:
+        for obj, name, original in reversed(originals):
+            setattr(obj, name, original)
+
+
+def timed(f, *args):
+    gc.collect()
+    t = time.perf_counter()
+    result = f(*args)
+    return result, time.perf_counter() - t
+
+
+def measure(num_nodes: int, num_variables: int = 100, value_size: int = 1000) -> dict:
+    """Returns the times in seconds of saving and loading a project"""
+
+    session = build_project(num_nodes, num_variables, value_size)
+
+    project, serialize_time = timed(session.serialize)
+    text, dumps_time = timed(json.dumps, project)
+    loaded_project, loads_time = timed(json.loads, text)
+    binary, serialize_binary_time = timed(session.serialize, True)
+    del session, project
+
+    new_session = Session()
+    new_session.register_node(LoadNode)
+
+    # the plain loading time, and the phases in a second run, as wrapping the functions adds some overhead
+    _, load_time = timed(new_session.load, loaded_project)
+    new_session.delete_script(new_session.scripts[0])
+
+    phases = {}
+    with phase_timers(phases):
+        _, load_time_wrapped = timed(new_session.load, loaded_project)
+    phases['other'] = load_time_wrapped - sum(phases.values())
+    new_session.delete_script(new_session.scripts[0])
+
+    _, load_binary_time = timed(new_session.load, binary)
+
+    return {
+        'nodes': num_nodes,
+        'variables': num_variables,
+        'value size': value_size,
+        'json size [bytes]': len(text),
+        'Session.serialize() [s]': serialize_time,
+        'json.dumps() [s]': dumps_time,
+        'json.loads() [s]': loads_time,
+        'Session.load() [s]': load_time,
+        'Session.load() phases [s]': phases,
+        'binary size [bytes]': len(binary),
+        'Session.serialize(binary=True) [s]': serialize_binary_time,
+        'Session.load(binary) [s]': load_binary_time,
+    }
+
+
+def run(sizes=(1000, 10000), num_variables: int = 100, value_size: int = 1000, log=None) -> dict:
+    results = []
+    for num_nodes in sizes:
+        result = measure(num_nodes, num_variables, value_size)
+        results.append(result)
+        if log is not None:
+            log(result)
+
+    return {
+        'ryvencore': version(),
+        'python': sys.version,
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+
+
+def print_result(r: dict):
+    print(f'{r["nodes"]} nodes, {r["variables"]} variables, {r["json size [bytes]"] / 1e6:.1f} MB JSON')
+    for key in ('Session.serialize() [s]', 'json.dumps() [s]', 'json.loads() [s]', 'Session.load() [s]'):
+        print(f'    {key[:-4]:<24} {r[key]:>8.3f} s')
+    for phase, t in r['Session.load() phases [s]'].items():
+        print(f'        {phase:<20} {t:>8.3f} s')
+    print(f'  binary format, {r["binary size [bytes]"] / 1e6:.1f} MB')
+    for key in ('Session.serialize(binary=True) [s]', 'Session.load(binary) [s]'):
+        print(f'    {key[:-4]:<24} {r[key]:>8.3f} s')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='ryvencore serialization benchmarks')
+    parser.add_argument('-o', '--output', default='serialization_benchmark.json', help='JSON results file')
+    parser.add_argument('-n', '--nodes', nargs='*', type=int, default=[1000, 10000], help='project sizes')
+    parser.add_argument('-v', '--variables', type=int, default=100, help='number of script variables')
+    parser.add_argument('-s', '--value-size', type=int, default=1000, help='length of the input values')
+    args = parser.parse_args()
+
+    results = run(args.nodes, args.variables, args.value_size, log=print_result)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'results written to {args.output}')
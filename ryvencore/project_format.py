@@ -0,0 +1,285 @@
+"""
+The binary project format, an alternative to the JSON compatible project dicts for Session.serialize() and
+Session.load(). In the dicts, every serialized value (node states, values of unconnected inputs, dtype states,
+script variables) is a base64 encoded pickle, which inflates the size by a third and has to be parsed as
+JSON string. The binary format instead stores the project's structure (the same dicts, with BlobRefs in place
+of the serialized values) as pickle streams, followed by a blob table holding the raw pickled values.
+It's a chunked container, every script is stored in its own chunk, and an index at the start holds the rest
+of the project and a table of contents of the scripts:
+
+    MAGIC (8 bytes) | index length, chunks length (8 bytes each, little endian) | sidecar generation (16 bytes)
+    | index (pickle) | chunks | blobs
+
+The BlobRefs are pickled as persistent ids giving the position of their blob. When loading, they refer to
+slices of the loaded data without copying it, and the values are only unpickled where the project
+gets deserialized, like in the JSON format. The blob table is content-addressed (see utils.BlobTable),
+identical values, like the states of nodes created from templates, are stored once and all references
+to them load the same BlobRef, which shares the deserialized value if it's immutable. Values with
+out-of-band buffers (see below) are stored once per reference, so they never share memory.
+Loaded lazily, the scripts of a project are ScriptChunks, which only unpickle their chunk when needed,
+see Session.load().
+
+Saved to a file with save(), large buffers of the values supporting pickle protocol 5 out-of-band buffers
+(like the data of NumPy arrays) are written to a sidecar file next to the project (SIDECAR_SUFFIX), straight
+from the values' memory, and load() memory-maps the sidecar, so the values refer to the mapped file instead
+of being copied into memory. The mapping is copy-on-write, so the values stay writable without changing
+the file. The BlobRefs of such values also give the positions of their buffers in the sidecar.
+The sidecar starts with SIDECAR_MAGIC and a random generation id, which is also stored in the project's
+header (zeros if there is no sidecar), so a sidecar which doesn't belong to the project, e.g. after a crash
+while saving, is rejected instead of giving wrong values.
+The project file itself is memory-mapped as well, so only the parts which are actually loaded get read.
+"""
+
+import io
+import mmap
+import os
+import pickle
+import struct
+import uuid
+
+from .utils import BlobRef, BlobTable
+
+
+MAGIC = b'RYVNPRJ\x03'
+_HEADER = struct.Struct('<8sQQ16s')
+
+SIDECAR_SUFFIX = '.buffers'
+SIDECAR_MAGIC = b'RYVNBUF\x01'
+BUFFER_ALIGNMENT = 64   # of the buffers in the sidecar, so e.g. NumPy arrays mapped from it are aligned
+_SIDECAR_HEADER = struct.Struct('<8s16s')
+_SIDECAR_HEADER_SIZE = BUFFER_ALIGNMENT     # the header padded to the alignment of the buffers
+_NO_SIDECAR = bytes(16)
+
+
+def is_binary(data) -> bool:
+    """Returns whether data is a binary project"""
+
+    return isinstance(data, (bytes, bytearray, memoryview, mmap.mmap)) and bytes(data[:len(MAGIC)]) == MAGIC
+
+
+def sidecar_path(path: str) -> str:
+    return path + SIDECAR_SUFFIX
+
+
+class _StructurePickler(pickle.Pickler):
+
+    def __init__(self, file, positions: dict):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.positions = positions  # id(BlobRef) -> persistent id, see _positions()
+
+    def persistent_id(self, obj):
+        if type(obj) is BlobRef:
+            return self.positions[id(obj)]
+        return None
+
+
+class _StructureUnpickler(pickle.Unpickler):
+
+    def __init__(self, file, blobs: memoryview, sidecar: memoryview, refs: dict):
+        super().__init__(file)
+        self.blobs = blobs
+        self.sidecar = sidecar
+        self.refs = refs    # persistent id -> BlobRef without out-of-band buffers, shared by all chunks
+
+    def persistent_load(self, pid):
+        offset, length = pid[:2]
+
+        if len(pid) > 2:
+            # a value with out-of-band buffers, which are never shared (see utils.BlobTable)
+            if self.sidecar is None or pid[2][-1][0] + pid[2][-1][1] > len(self.sidecar):
+                raise Exception('missing or invalid sidecar file of a binary ryvencore project')
+            return BlobRef(
+                self.blobs[offset:offset + length],
+                [self.sidecar[o:o + n] for o, n in pid[2]],
+            )
+
+        ref = self.refs.get(pid)
+        if ref is None:
+            ref = self.refs[pid] = BlobRef(self.blobs[offset:offset + length])
+        return ref
+
+
+class ScriptChunk:
+    """A script of a lazily loaded binary project, see loads()"""
+
+    __slots__ = ('title', 'GID', '_unpickler')
+
+    def __init__(self, title: str, GID, unpickler):
+        self.title = title
+        self.GID = GID
+        self._unpickler = unpickler
+
+    def load(self) -> dict:
+        """Returns the script's data dict"""
+
+        return self._unpickler().load()
+
+
+def _positions(table: BlobTable) -> dict:
+    """Returns the persistent ids of the table's BlobRefs, (offset, length) of the blob, followed by
+    ((offset, length), ...) of the out-of-band buffers in the sidecar, if there are any"""
+
+    positions = {}
+    offset = 0
+    sidecar_offset = 0
+    for ref in table.blobs:
+        if len(ref.buffers) == 0:
+            positions[id(ref)] = (offset, len(ref.data))
+        else:
+            buffers = []
+            for b in ref.buffers:
+                sidecar_offset += -sidecar_offset % BUFFER_ALIGNMENT
+                buffers.append((sidecar_offset, b.raw().nbytes))
+                sidecar_offset += b.raw().nbytes
+            positions[id(ref)] = (offset, len(ref.data), tuple(buffers))
+        offset += len(ref.data)
+
+    return positions
+
+
+def dump(project: dict, table: BlobTable, file, sidecar_file=None):
+    """Writes the binary project of a project dict serialized within utils.blob_table() to a binary file,
+    and the table's out-of-band buffers to sidecar_file"""
+
+    positions = _positions(table)
+
+    chunks = io.BytesIO()
+    toc = []
+    for script in project['scripts']:
+        start = chunks.tell()
+        _StructurePickler(chunks, positions).dump(script)
+        toc.append({
+            'title': script.get('title'),
+            'GID': script.get('GID'),
+            'chunk': (start, chunks.tell() - start),
+        })
+
+    index = io.BytesIO()
+    _StructurePickler(index, positions).dump({
+        'project': {k: v for k, v in project.items() if k != 'scripts'},
+        'scripts': toc,
+    })
+
+    has_buffers = any(len(ref.buffers) > 0 for ref in table.blobs)
+    if has_buffers and sidecar_file is None:
+        raise Exception('out-of-band buffers require a sidecar file')
+    generation = uuid.uuid4().bytes if has_buffers else _NO_SIDECAR
+
+    file.write(_HEADER.pack(MAGIC, index.tell(), chunks.tell(), generation))
+    file.write(index.getbuffer())
+    file.write(chunks.getbuffer())
+    for ref in table.blobs:
+        file.write(ref.data)
+
+    if not has_buffers:
+        return
+
+    header = _SIDECAR_HEADER.pack(SIDECAR_MAGIC, generation)
+    sidecar_file.write(header + bytes(_SIDECAR_HEADER_SIZE - len(header)))
+
+    offset = 0
+    for ref in table.blobs:
+        for b in ref.buffers:
+            padding = -offset % BUFFER_ALIGNMENT
+            sidecar_file.write(bytes(padding))
+            raw = b.raw()
+            sidecar_file.write(raw)
+            offset += padding + raw.nbytes
+
+
+def dumps(project: dict, table: BlobTable) -> bytes:
+    """Returns the binary project of a project dict serialized within utils.blob_table()"""
+
+    out = io.BytesIO()
+    dump(project, table, out)
+    return out.getvalue()
+
+
+def loads(data, sidecar=None, lazy: bool = False) -> dict:
+    """
+    Returns the project dict of a binary project, with BlobRefs referring into data (and sidecar).
+    If lazy is set, the scripts are ScriptChunks instead of dicts, and data must not be changed until
+    all of them have been loaded.
+    """
+
+    if not is_binary(data):
+        raise Exception('not a binary ryvencore project')
+
+    view = memoryview(data)
+    _, index_length, chunks_length, generation = _HEADER.unpack_from(view)
+    chunks_start = _HEADER.size + index_length
+    blobs = view[chunks_start + chunks_length:]
+    refs = {}
+
+    if generation == _NO_SIDECAR:
+        sidecar = None
+    elif sidecar is None:
+        raise Exception('missing sidecar file of a binary ryvencore project')
+    else:
+        sidecar = memoryview(sidecar)
+        if len(sidecar) < _SIDECAR_HEADER_SIZE or \
+                _SIDECAR_HEADER.unpack_from(sidecar) != (SIDECAR_MAGIC, generation):
+            raise Exception('the sidecar file doesn\'t belong to the binary ryvencore project')
+        sidecar = sidecar[_SIDECAR_HEADER_SIZE:]
+
+    def unpickler(start, length):
+        return _StructureUnpickler(io.BytesIO(view[start:start + length]), blobs, sidecar, refs)
+
+    index = unpickler(_HEADER.size, index_length).load()
+
+    project = dict(index['project'])
+    project['scripts'] = []
+    for entry in index['scripts']:
+        offset, length = entry['chunk']
+        chunk = ScriptChunk(
+            entry['title'], entry['GID'],
+            lambda start=chunks_start + offset, length=length: unpickler(start, length),
+        )
+        project['scripts'].append(chunk if lazy else chunk.load())
+
+    return project
+
+
+def save(project: dict, table: BlobTable, path: str):
+    """
+    Saves a project dict serialized within utils.blob_table() to the file path, and its out-of-band buffers
+    to the sidecar file. Both are written to temporary files first, which then replace the old ones, so
+    values still mapped from old files (see load()) aren't affected. The project file is replaced last,
+    if saving is interrupted before, the old project is rejected with the new sidecar when it's loaded.
+    """
+
+    sidecar = sidecar_path(path)
+    has_buffers = any(len(ref.buffers) > 0 for ref in table.blobs)
+
+    with open(path + '.tmp', 'wb') as f:
+        if has_buffers:
+            with open(sidecar + '.tmp', 'wb') as sf:
+                dump(project, table, f, sf)
+                sf.flush()
+                os.fsync(sf.fileno())
+        else:
+            dump(project, table, f)
+        f.flush()
+        os.fsync(f.fileno())
+
+    if has_buffers:
+        os.replace(sidecar + '.tmp', sidecar)
+    os.replace(path + '.tmp', path)
+    if not has_buffers and os.path.exists(sidecar):     # of a previous version of the project
+        os.remove(sidecar)
+
+
+def load(path: str, lazy: bool = False) -> dict:
+    """Returns the project dict of a binary project saved with save(), with the files memory-mapped,
+    see loads()"""
+
+    with open(path, 'rb') as f:
+        # the mappings stay valid after closing the files
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    sidecar = None
+    if os.path.exists(sidecar_path(path)) and os.path.getsize(sidecar_path(path)) > 0:
+        with open(sidecar_path(path), 'rb') as f:
+            sidecar = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    return loads(data, sidecar, lazy)
@@ -1,18 +1,186 @@
-"""A collection of useful functions used by different components."""
+"""A collection of useful functions and classes used by different components."""
 
 import base64
+import contextvars
+import gc
 import pickle
-from typing import List
+from contextlib import contextmanager
+from typing import List, Dict
 
 
-def serialize(data) -> str:
-    return base64.b64encode(pickle.dumps(data)).decode('ascii')
+class BlobRef:
+    """
+    A serialized value stored in the blob table of a binary project (see project_format), which replaces
+    the base64 string returned by serialize() while the project is serialized within blob_table().
+    """
+
+    __slots__ = ('data', 'buffers', 'value')
+
+    def __init__(self, data, buffers=()):
+        self.data = data        # the pickled value, a bytes-like object
+        self.buffers = buffers  # the pickle's out-of-band buffers, see BlobTable
+        self.value = _UNSET     # the deserialized value, if it's immutable and can be shared, see deserialize()
+
+    def __repr__(self):
+        return f'<BlobRef {len(self.data)} bytes, {len(self.buffers)} buffers>'
+
+
+class BlobTable:
+    """
+    The blob table of a binary project being serialized, see blob_table(). If buffer_threshold is set, the
+    values are pickled with protocol 5, and buffers of at least buffer_threshold bytes which support it
+    (like the data of NumPy arrays) are kept out-of-band as PickleBuffers referring to the original memory,
+    so they can be written to the project's sidecar file without being copied.
+    The table is content-addressed, identical pickles are stored once and share their BlobRef. Values with
+    out-of-band buffers are always stored separately, as their buffers are mapped into the loaded values
+    (see project_format), which must not share memory.
+    """
+
+    def __init__(self, buffer_threshold: int = None):
+        self.blobs = []     # [BlobRef]
+        self.index = {}     # pickle -> BlobRef, of the values without out-of-band buffers
+        self.buffer_threshold = buffer_threshold if pickle.HIGHEST_PROTOCOL >= 5 else None
+
+    def add(self, data) -> BlobRef:
+        if self.buffer_threshold is None:
+            ref = BlobRef(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+        else:
+            buffers = []
+
+            def out_of_band(buffer):
+                try:
+                    if buffer.raw().nbytes < self.buffer_threshold:
+                        return True     # in-band
+                except BufferError:     # not contiguous
+                    return True
+                buffers.append(buffer)
+                return False
+
+            ref = BlobRef(pickle.dumps(data, protocol=5, buffer_callback=out_of_band), buffers)
+
+        if len(ref.buffers) > 0:
+            self.blobs.append(ref)
+            return ref
+
+        return self._insert(ref.data, ref)
+
+    def add_loaded(self, ref: BlobRef) -> BlobRef:
+        """Adds a BlobRef of a loaded binary project without unpickling it, if possible"""
+
+        if len(ref.buffers) == 0:
+            data = bytes(ref.data)
+            return self._insert(data, BlobRef(data))
+
+        if self.buffer_threshold is None:   # can't be kept out-of-band
+            return self.add(deserialize(ref))
+
+        ref = BlobRef(ref.data, [pickle.PickleBuffer(b) for b in ref.buffers])
+        self.blobs.append(ref)
+        return ref
+
+    def _insert(self, key, ref: BlobRef) -> BlobRef:
+        existing = self.index.get(key)
+        if existing is not None:
+            return existing
+
+        self.index[key] = ref
+        self.blobs.append(ref)
+        return ref
+
+
+_UNSET = object()
+
+# types whose instances can be shared by all nodes loading the same blob, see deserialize()
+_IMMUTABLE_TYPES = {type(None), bool, int, float, complex, str, bytes, range}
+
+
+def _immutable(value) -> bool:
+    t = type(value)
+    if t in _IMMUTABLE_TYPES:
+        return True
+    if t is tuple or t is frozenset:
+        return all(_immutable(v) for v in value)
+    return False
+
+
+# the blob table of the binary project currently being serialized, see blob_table()
+_blob_table = contextvars.ContextVar('_blob_table', default=None)
+
+
+@contextmanager
+def blob_table(buffer_threshold: int = None):
+    """
+    A context manager inside which serialize() stores the pickled values in a BlobTable, which is returned,
+    and returns BlobRefs to them, instead of base64 strings
+    """
+
+    table = BlobTable(buffer_threshold)
+    token = _blob_table.set(table)
+    try:
+        yield table
+    finally:
+        _blob_table.reset(token)
+
+
+@contextmanager
+def gc_paused():
+    """
+    A context manager pausing the cyclic garbage collector, for building large numbers of objects at once,
+    like loading a project, during which the collector would repeatedly traverse the growing heap in vain
+    """
+
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def serialize(data):
+    table = _blob_table.get()
+    if table is None:
+        return base64.b64encode(pickle.dumps(data)).decode('ascii')
+
+    return table.add(data)
 
 
 def deserialize(data):
+    if type(data) is BlobRef:
+        if data.value is not _UNSET:
+            return data.value
+
+        if len(data.buffers) > 0:
+            value = pickle.loads(data.data, buffers=data.buffers)
+        else:
+            value = pickle.loads(data.data)
+
+        # a BlobRef can be referenced from many places of a loaded project, see BlobTable
+        if _immutable(value):
+            data.value = value
+        return value
+
     return pickle.loads(base64.b64decode(data))
 
 
+def reserialize(data):
+    """Returns a copy of data (dicts and lists) which was loaded from a project but not deserialized, with
+    the BlobRefs of a binary project serialized again, so it can be saved like the data of a new project"""
+
+    t = type(data)
+    if t is dict:
+        return {k: reserialize(v) for k, v in data.items()}
+    if t is list:
+        return [reserialize(v) for v in data]
+    if t is BlobRef:
+        table = _blob_table.get()
+        if table is not None:
+            return table.add_loaded(data)
+        return serialize(deserialize(data))
+    return data
+
+
 def node_from_identifier(identifier: str, nodes: List):
 
     for nc in nodes:
@@ -29,3 +197,189 @@ def node_from_identifier(identifier: str, nodes: List):
                 f'identifier to the identifier_comp list attribute to provide '
                 f'backwards compatibility.'
             )
+
+
+class OrderedSet:
+    """
+    An insertion ordered set with O(1) appends, removals and membership tests, which also provides the
+    interface of a list (indexing, index(), insert(), pop(), concatenation and comparison with lists),
+    so it can replace lists of unique objects like the nodes and connections of a flow. The positions
+    are computed lazily on the first positional access after a removal, so positional access is O(1)
+    as long as only items are appended. Unlike a list, it holds every item only once: appending or
+    inserting an item it already contains does nothing.
+    """
+
+    def __init__(self, items=()):
+        self._items = dict.fromkeys(items)
+        self._list = None       # list of the items, built on positional access
+        self._positions = None  # item -> position, built on index()
+
+    def append(self, item):
+        if item in self._items:
+            return
+
+        self._items[item] = None
+        if self._list is not None:
+            self._list.append(item)
+        if self._positions is not None:
+            self._positions[item] = len(self._positions)
+
+    add = append
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def insert(self, index: int, item):
+        """O(n) like list.insert(), unless the item is appended"""
+        if item in self._items:
+            return
+        if index >= len(self._items):
+            self.append(item)
+            return
+
+        items = list(self._items)
+        items.insert(index, item)
+        self._items = dict.fromkeys(items)
+        self._list = None
+        self._positions = None
+
+    def remove(self, item):
+        try:
+            del self._items[item]
+        except KeyError:
+            raise ValueError(f'{item} not in OrderedSet') from None
+        self._list = None
+        self._positions = None
+
+    def discard(self, item):
+        if item in self._items:
+            self.remove(item)
+
+    def pop(self, index: int = -1):
+        if not self._items:
+            raise IndexError('pop from empty OrderedSet')
+        if index == -1 or index == len(self._items) - 1:
+            item, _ = self._items.popitem()
+            if self._list is not None:
+                self._list.pop()
+            if self._positions is not None:
+                del self._positions[item]
+            return item
+
+        item = self[index]
+        self.remove(item)
+        return item
+
+    def clear(self):
+        self._items.clear()
+        self._list = None
+        self._positions = None
+
+    def index(self, item) -> int:
+        if self._positions is None:
+            self._positions = {x: i for i, x in enumerate(self._items)}
+        try:
+            return self._positions[item]
+        except KeyError:
+            raise ValueError(f'{item} not in OrderedSet') from None
+
+    def copy(self):
+        return OrderedSet(self._items)
+
+    def __getitem__(self, index):
+        if self._list is None:
+            self._list = list(self._items)
+        return self._list[index]
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __reversed__(self):
+        # dicts are only reversible since Python 3.8
+        if self._list is None:
+            self._list = list(self._items)
+        return reversed(self._list)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __eq__(self, other):
+        # compares like a list, including the order
+        if isinstance(other, (OrderedSet, list)):
+            return len(self) == len(other) and all(a is b or a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None     # mutable, like a list
+
+    def __add__(self, other) -> list:
+        if not isinstance(other, (OrderedSet, list)):
+            return NotImplemented
+        return list(self._items) + list(other)
+
+    def __radd__(self, other) -> list:
+        if not isinstance(other, list):
+            return NotImplemented
+        return list(other) + list(self._items)
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __repr__(self):
+        return f'OrderedSet({list(self._items)})'
+
+
+def strongly_connected_components(nodes: List, successors: Dict) -> List[List]:
+    """Returns the strongly connected components of the directed graph given by the nodes and a dict holding
+    the successors (any iterable) of every node, in reverse topological order. This is an iterative version of Tarjan's
+    algorithm, so it's not limited by the recursion limit."""
+
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    for start in nodes:
+        if start in index:
+            continue
+
+        index[start] = lowlink[start] = len(index)
+        stack.append(start)
+        on_stack.add(start)
+        work = [(start, iter(successors.get(start, ())))]
+
+        while len(work) > 0:
+            n, it = work[-1]
+            s = next(it, None)
+
+            if s is not None:
+                if s not in index:
+                    index[s] = lowlink[s] = len(index)
+                    stack.append(s)
+                    on_stack.add(s)
+                    work.append((s, iter(successors.get(s, ()))))
+                elif s in on_stack:
+                    lowlink[n] = min(lowlink[n], index[s])
+                continue
+
+            work.pop()
+            if len(work) > 0:
+                p = work[-1][0]
+                lowlink[p] = min(lowlink[p], lowlink[n])
+
+            if lowlink[n] == index[n]:
+                component = []
+                while True:
+                    m = stack.pop()
+                    on_stack.discard(m)
+                    component.append(m)
+                    if m is n:
+                        break
+                components.append(component)
+
+    return components